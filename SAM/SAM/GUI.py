@@ -1,5 +1,4 @@
 # Improved Dash GUI that can set parameters from av.py and run N_Moving_Objects
-import importlib
 import sys
 import threading
 import io
@@ -14,6 +13,7 @@ from dash.dependencies import Input, Output, State
 # Make sure av does not run heavy dataset I/O on import; GUI should open first.
 os.environ.setdefault('AV_SKIP_LOAD', '1')
 import av
+import N_Moving_Objects
 
 # Globals to track background run and its output
 run_thread = None
@@ -23,7 +23,7 @@ stop_requested = False
 
 
 def run_moving_objects_in_background(params):
-    """Background runner: set av parameters then import/reload N_Moving_Objects.
+    """Background runner: load the dataset and set av parameters, then run N_Moving_Objects.
     Captures stdout/stderr into last_output and updates last_status.
     """
     global last_output, last_status, stop_requested
@@ -31,14 +31,6 @@ def run_moving_objects_in_background(params):
     last_status = "running"
     buf = io.StringIO()
     try:
-        # Apply parameters to av module
-        for k, v in params.items():
-            setattr(av, k, v)
-
-        # Ensure dataset_name is provided via environment so av will pick it up on reload
-        if 'dataset_name' in params and params['dataset_name']:
-            os.environ['AV_DATASET'] = params['dataset_name']
-
         # Ensure results_dir is provided via environment so modules can write into it
         if 'results_dir' in params and params['results_dir']:
             results_dir = params['results_dir']
@@ -48,38 +40,31 @@ def run_moving_objects_in_background(params):
             except Exception:
                 pass
 
-        # Allow av to run its loading logic on reload
-        os.environ['AV_SKIP_LOAD'] = '0'
-        # Capture stdout while importing/reloading heavy module
+        # N_T_OB reads the dataset from AV_DATASET, so it must name the chosen dataset too
+        dataset_name = params.get('dataset_name') or 'N_C_Dataset.csv'
+        os.environ['AV_DATASET'] = dataset_name
+
+        # Capture stdout while running the analysis
         with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
-            # If already imported, reload to rerun top-level logic
-            try:
-                # Reload av so it processes the dataset with the provided AV_DATASET
-                importlib.reload(av)
+            # Load the chosen dataset, then apply the parameters (the settings are kept in av, no reload needed)
+            av.load_dataset(dataset_name)
+            av.configure(**params)
 
-                # Re-apply parameters AFTER reload (reload resets av to defaults!)
-                for k, v in params.items():
-                    setattr(av, k, v)
+            # Debug prints to help diagnose flag propagation and results_dir
+            print('\n--- DEBUG: run parameters passed from GUI ---')
+            try:
+                print('params:', {k: params[k] for k in params})
+            except Exception:
+                print('params (could not stringify)')
+            print('AV_RESULTS_DIR env:', os.environ.get('AV_RESULTS_DIR'))
+            print('av.N_VA_InequalityMatrices =', getattr(av, 'N_VA_InequalityMatrices', None))
+            print('av.N_PDP =', getattr(av, 'N_PDP', None))
+            print('av.PDPg_buffer_active =', getattr(av, 'PDPg_buffer_active', None))
+            print('av.PDPg_rough_active =', getattr(av, 'PDPg_rough_active', None))
+            print('av.PDPg_fundamental_active =', getattr(av, 'PDPg_fundamental_active', None))
+            print('--- end DEBUG ---\n')
 
-                # Debug prints to help diagnose flag propagation and results_dir
-                print('\n--- DEBUG: run parameters passed from GUI ---')
-                try:
-                    print('params:', {k: params[k] for k in params})
-                except Exception:
-                    print('params (could not stringify)')
-                print('AV_RESULTS_DIR env:', os.environ.get('AV_RESULTS_DIR'))
-                print('av.N_VA_InequalityMatrices =', getattr(av, 'N_VA_InequalityMatrices', None))
-                print('av.N_PDP =', getattr(av, 'N_PDP', None))
-                print('av.PDPg_buffer_active =', getattr(av, 'PDPg_buffer_active', None))
-                print('av.PDPg_rough_active =', getattr(av, 'PDPg_rough_active', None))
-                print('av.PDPg_fundamental_active =', getattr(av, 'PDPg_fundamental_active', None))
-                print('--- end DEBUG ---\n')
-
-                import N_Moving_Objects
-                importlib.reload(N_Moving_Objects)
-            except ModuleNotFoundError:
-                # First run - module not imported yet
-                import N_Moving_Objects
+            N_Moving_Objects.run()
 
         # Check if stop was requested during execution
         if stop_requested:
@@ -439,12 +424,13 @@ def launch_results_viewer(n_clicks, script_path, dataset_name, results_dir):
             script_dir = os.path.dirname(app_path) or os.getcwd()
 
             # Prepare environment for subprocess: pass AV_RESULTS_DIR and AV_DATASET so the viewer auto-fills paths
-            env = os.environ.copy()
+            overlay = {}
             if results_dir:
-                env['AV_RESULTS_DIR'] = results_dir
+                overlay['AV_RESULTS_DIR'] = results_dir
             # dataset_name state can override
             if dataset_name:
-                env['AV_DATASET'] = dataset_name
+                overlay['AV_DATASET'] = dataset_name
+            env = {**os.environ, **overlay}
 
             # Prefer running Streamlit with the same Python interpreter (works inside venvs):
             try:
@@ -499,11 +485,12 @@ def open_existing_results(n_clicks, script_path, results_dir, dataset_name):
             script_dir = os.path.dirname(app_path) or os.getcwd()
 
             # Prepare environment for subprocess: pass AV_RESULTS_DIR so the viewer reads the right folder
-            env = os.environ.copy()
+            overlay = {}
             if results_dir:
-                env['AV_RESULTS_DIR'] = results_dir
+                overlay['AV_RESULTS_DIR'] = results_dir
             if dataset_name:
-                env['AV_DATASET'] = dataset_name
+                overlay['AV_DATASET'] = dataset_name
+            env = {**os.environ, **overlay}
 
             # Try starting streamlit with the same interpreter if available
             try:
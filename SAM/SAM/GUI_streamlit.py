@@ -10,15 +10,25 @@ Run with: streamlit run GUI_streamlit.py
 import streamlit as st
 import os
 import sys
-import threading
 import time
-import subprocess
-import io
-import contextlib
-import importlib
+import json
+import codecs
+import re
 from pathlib import Path
+import threading
+from types import MappingProxyType
 import warnings
 
+from analysis_status import STATUS_FILE_NAME, write_status
+
+# Optional: watchdog reports changes in the results directory, so the log is only read when it was written to.
+# Without it the log size is checked on every refresh.
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
 # Set page config first (must be first Streamlit command)
 st.set_page_config(
     page_title="🚀 PDP Analysis Dashboard",
@@ -30,107 +40,294 @@ st.set_page_config(
 # Set environment to skip heavy loading during import
 os.environ.setdefault('AV_SKIP_LOAD', '1')
 
-# Configure matplotlib to suppress font warnings and use available fonts
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
 
-# Suppress matplotlib font warnings
-warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
-warnings.filterwarnings('ignore', message='findfont: Font family.*not found')
+@st.cache_resource
+def init_matplotlib():
+    """
+    Configures matplotlib once per Streamlit process instead of on every rerun:
+    non-interactive backend, no font warnings and fonts that are available on all systems.
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend
+    import matplotlib.pyplot as plt
+    
+    # Suppress matplotlib font warnings
+    warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
+    warnings.filterwarnings('ignore', message='findfont: Font family.*not found')
+    
+    # Set matplotlib to use DejaVu Sans (available on all systems) instead of Arial
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'Helvetica', 'sans-serif']
+    return plt
+
+
+plt = init_matplotlib()
+
+# Fallback values for the av settings that are used as widget defaults
+AV_FALLBACKS = {
+    'PDPg_buffer': 1, 'PDPg_rough': 0, 'PDPg_bufferrough': 0,
+    'window_length_tst': 3,
+    'buffer_x': 1, 'buffer_y': 1, 'rough_x': 0, 'rough_y': 0,
+    'dataset_name': 'N_C_Dataset.csv',
+    'num_frames': 20,
+    'min_boundary_x': -5, 'min_boundary_y': -5, 'max_boundary_x': 15, 'max_boundary_y': 30,
+    'DD': 2, 'des': 2, 'dim': 2,
+    'num_similar_configurations': 5, 'new_configuration_step': 3, 'division_factor': 5,
+    # Module toggles
+    'N_PDP': 0, 'N_VA_StaticAbsolute': 0, 'N_VA_HeatMap': 0, 'N_VA_HClust': 0, 'N_VA_Mds': 0,
+    'N_VA_InequalityMatrices': 0, 'N_VA_TopK': 0, 'N_VA_TennisCourt': 0,
+}
+
+
+@st.cache_resource
+def get_av_defaults():
+    """
+    Imports av once per Streamlit process and returns a read-only snapshot of the settings used as widget defaults.
+    The snapshot is shared by all sessions; get_av_defaults.clear() rebuilds it (e.g. after editing av.py).
+    """
+    import av
+    return MappingProxyType({key: getattr(av, key, fallback) for key, fallback in AV_FALLBACKS.items()})
+
+
+@st.cache_resource
+def get_default_modules(module_names):
+    """
+    Returns the modules that are switched on in av, as the default module selection.
+    Kept as a shared tuple, so reruns get the same object instead of a copy.
+    """
+    av_defaults = get_av_defaults()
+    return tuple(name for name in module_names if av_defaults[name] == 1)
+
+
+@st.cache_data(show_spinner=False)
+def upload_path(file_id, _uploaded_file):
+    """
+    Returns the temporary CSV path of an uploaded dataset, named after a hash of its contents.
+    Cached per upload (file_id), so the upload is hashed once instead of on every rerun.
+    """
+    import hashlib
+    import tempfile
+    digest = hashlib.md5(_uploaded_file.getbuffer()).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f'sam_upload_{digest}.csv')
+
+
+def materialize_upload(uploaded_file):
+    """
+    Saves an uploaded dataset to a temporary CSV file and returns its path.
+    The file is only written when it does not exist (yet or anymore, e.g. after a cleanup of the
+    temporary directory): uploading the same dataset again reuses it.
+    """
+    import shutil
+    import tempfile
+    path = upload_path(uploaded_file.file_id, uploaded_file)
+    if not os.path.isfile(path):
+        # Stream the upload in 1 MiB blocks to a uniquely named file, so sessions saving the same
+        # dataset at the same time do not share it, and move the complete file into place
+        uploaded_file.seek(0)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix='sam_upload_', suffix='.tmp',
+                                         delete=False, buffering=UPLOAD_BLOCK_SIZE) as tmp_file:
+            shutil.copyfileobj(uploaded_file, tmp_file, length=UPLOAD_BLOCK_SIZE)
+        os.replace(tmp_file.name, path)
+    return path
+
 
-# Set matplotlib to use DejaVu Sans (available on all systems) instead of Arial
-plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'Helvetica', 'sans-serif']
+# Get defaults from av
+av_defaults = get_av_defaults()
 
-# Import av to get defaults
-import av
+# Numeric parameters passed to the analysis as int
+NUMERIC_PARAMS = (
+    'window_length_tst', 'num_frames',
+    'buffer_x', 'buffer_y', 'rough_x', 'rough_y',
+    'min_boundary_x', 'max_boundary_x', 'min_boundary_y', 'max_boundary_y',
+    'DD', 'des', 'dim',
+    'num_similar_configurations', 'new_configuration_step', 'division_factor',
+)
+
+# Default values of the session state (immutable, so they can be shared between sessions)
+SESSION_DEFAULTS = {
+    'authenticated': False,
+    'run_process': None,
+    'last_status': 'idle',
+    'last_output': '',
+    'log_offset': 0,  # Bytes of the log file already read into last_output
+    'log_fh': None,  # Log file kept open while an analysis runs
+    'progress': None,  # Progress state of the current run, see new_progress()
+    'stop_requested': False,
+    'analysis_finished': False,
+    'log_file_path': None,
+    'analysis_params': None,
+    'results_directory': None,
+    'expand_all_images': True,  # Default: show all images
+    'status_cache': None,  # (file identity, status dict) of the last status file read
+    'results_watcher': None,  # (watchdog observer, changed event) while an analysis runs
+    'show_debug': False,  # sidebar toggle for the debug information in the status panel
+}
 
 # Initialize session state for persistent data
-if 'authenticated' not in st.session_state:
-    st.session_state.authenticated = False
-if 'run_thread' not in st.session_state:
-    st.session_state.run_thread = None
-if 'last_status' not in st.session_state:
-    st.session_state.last_status = 'idle'
-if 'last_output' not in st.session_state:
-    st.session_state.last_output = ''
-if 'stop_requested' not in st.session_state:
-    st.session_state.stop_requested = False
-if 'analysis_finished' not in st.session_state:
-    st.session_state.analysis_finished = False
-if 'log_file_path' not in st.session_state:
-    st.session_state.log_file_path = None
-if 'analysis_params' not in st.session_state:
-    st.session_state.analysis_params = None
-if 'results_directory' not in st.session_state:
-    st.session_state.results_directory = None
-if 'expand_all_images' not in st.session_state:
-    st.session_state.expand_all_images = True  # Default: show all images
+for key, value in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+if 'log_decoder' not in st.session_state:
+    # Created per session: the decoder keeps state between reads and must not be shared
+    st.session_state.log_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
 
 # Password configuration (you can change this or use environment variable)
 CORRECT_PASSWORD = os.environ.get('APP_PASSWORD', 'SAM2024')  # Default password or set via environment
 
+# Folder with av.py and the analysis modules (working directory of the analysis process)
+SAM_DIR = os.path.dirname(os.path.abspath(__file__))
+SAM_DEBUG = bool(os.environ.get('SAM_DEBUG'))  # set SAM_DEBUG=1 for extra debug output in the log
+
+# Environment variables passed on to the results viewer (Python, Streamlit and OS essentials)
+VIEWER_ENV_KEYS = (
+    'PATH', 'PYTHONPATH', 'HOME', 'USERPROFILE', 'SYSTEMROOT', 'APPDATA', 'LOCALAPPDATA',
+    'TEMP', 'TMP', 'TMPDIR', 'LANG', 'LC_ALL',
+)
+
+# Common paths shown in the dataset column (resolved once instead of on every rerun)
+CURRENT_DIR = os.getcwd()
+HOME_DIR = os.path.expanduser('~')
+DESKTOP_DIR = os.path.join(HOME_DIR, 'Desktop')
+DOCUMENTS_DIR = os.path.join(HOME_DIR, 'Documents')
+DEFAULT_RESULTS_DIR = os.environ.get('AV_RESULTS_DIR', CURRENT_DIR)
+
+# Buffer size of the log file the analysis process writes to
+LOG_FILE_BUFFER_SIZE = 128 * 1024  # bytes
+LOG_MAX_CHARS = 200 * 1024  # only the end of the log is kept in session state for display
+LOG_TAIL_CHARS = 8192  # end of the log that is shown on the page
+REFRESH_INTERVAL = 2.0  # seconds between automatic refreshes while an analysis runs
+UPLOAD_BLOCK_SIZE = 1024 * 1024  # bytes copied at a time when an uploaded dataset is saved
+
+# Status line for each analysis status, formatted once instead of on every rerun
+STATUS_MD = {
+    status: f"**Status:** :{color}[{emoji} {status.upper()}]"
+    for status, (emoji, color) in {
+        'idle': ('💤', 'gray'),
+        'starting': ('🔄', 'blue'),
+        'running': ('⚙️', 'blue'),
+        'finished': ('✅', 'green'),
+        'stopped': ('⏹️', 'orange'),
+        'error': ('❌', 'red'),
+    }.items()
+}
+
+# Modules that can be selected in the GUI, with their labels
+MODULE_OPTIONS = {
+    'N_PDP': 'PDP Calculation (Distance Matrices)',
+    'N_VA_StaticAbsolute': 'Static Absolute',
+    'N_VA_HeatMap': 'Heatmap',
+    'N_VA_HClust': 'Hierarchical Clustering',
+    'N_VA_Mds': 'MDS',
+    'N_VA_InequalityMatrices': 'Inequality Matrices',
+    'N_VA_TopK': 'Top K',
+    'N_VA_TennisCourt': '🎾 Tennis Court',
+}
+# Modules that need the PDP calculation: selecting one of them switches N_PDP on
+N_PDP_DEPENDENTS = frozenset({'N_VA_HeatMap', 'N_VA_HClust', 'N_VA_Mds', 'N_VA_TopK', 'N_VA_InequalityMatrices'})
+
+# Progress tracking: module names in the timing messages and the stage markers in the log
+MODULE_LABELS = {
+    'N_VA_StaticAbsolute': 'Static Absolute',
+    'N_VA_TennisCourt': 'Tennis Court',
+    'N_PDP': 'PDP Calculation',
+    'N_VA_HeatMap': 'Heatmap',
+    'N_VA_HClust': 'Hierarchical Clustering',
+    'N_VA_Mds': 'MDS',
+    'N_VA_TopK': 'Top-K Analysis',
+    'N_T_OB': 'Buffer Transform',
+    'N_VA_InequalityMatrices': 'Inequality Matrices',
+}
+STAGE_MARKERS = {
+    'ALL PDP PROCESSING COMPLETE': ("✅ Analysis Complete!", 100),
+    'STARTING PDP: BUFFER': ("Processing Buffer PDP...", 60),
+    'STARTING PDP: FUNDAMENTAL': ("Processing Fundamental PDP...", 30),
+    'STARTING ANALYSIS': ("Initializing...", 10),
+}
+# One pattern for all markers, so new output is scanned in a single pass
+PROGRESS_PATTERN = re.compile(
+    r'Time elapsed for running module "(?P<module>[^"]+)"|(?P<stage>'
+    + '|'.join(re.escape(marker) for marker in STAGE_MARKERS) + ')'
+)
+# Whole timing lines, shown in the log expander titles
+ELAPSED_PATTERN = re.compile(
+    r'^.*(?:Time elapsed for running module|(?P<total>Total time elapsed)).*$', re.MULTILINE
+)
+
+# Results viewer: image categories in order of precedence, with the keywords looked for in the relative path
+RESULT_CATEGORIES = (
+    ('Tennis Court', r'tennis_?court'),
+    ('Static Absolute', r'static.*absolute'),
+    ('Heatmaps', r'heatmap'),
+    ('Hierarchical Clustering', r'hclust|dendrogram|cluster'),
+    ('MDS', r'mds'),
+    ('Top-K', r'top[_-]?k'),
+    ('Tennis Court', r'tennis|court'),
+    ('Inequality Matrices', r'inequality'),
+)
+# One lookahead per category, tried in order; the empty group after the first that matches gives the category
+RESULT_CATEGORY_PATTERN = re.compile(
+    '|'.join(f'(?=.*(?:{keywords}))()' for _, keywords in RESULT_CATEGORIES), re.IGNORECASE
+)
+
+
+def new_progress():
+    """
+    Returns the progress state for a new analysis run (kept in st.session_state.progress).
+    """
+    return {
+        'completed': set(),  # unique modules that finished
+        'modules_run': 0,  # finished module runs, counting every PDP variant
+        'stage': "Starting...",
+        'stage_progress': 5,
+        'pending': '',  # incomplete last line, scanned once the rest of it is read
+        'last_elapsed': '',  # last timing line in the log
+        'total_elapsed': '',  # "Total time elapsed" line once the analysis is complete
+    }
+
 
-def calculate_progress(output_text, params):
+def update_progress(progress, new_output):
+    """
+    Updates the progress state with log output that was read since the previous rerun.
+    Only the new output is scanned, so the work per rerun does not grow with the log.
+    """
+    text = progress['pending'] + new_output
+    cut = text.rfind('\n') + 1
+    text, progress['pending'] = text[:cut], text[cut:]
+    
+    for match in PROGRESS_PATTERN.finditer(text):
+        if match.group('module'):
+            # Count completed modules by looking for "Time elapsed for running module" messages
+            module_label = MODULE_LABELS.get(match.group('module'))
+            if module_label:
+                progress['completed'].add(module_label)
+                progress['modules_run'] += 1
+        else:
+            # Move to a later stage when its marker appears
+            stage, stage_progress = STAGE_MARKERS[match.group('stage')]
+            if stage_progress > progress['stage_progress']:
+                progress['stage'] = stage
+                progress['stage_progress'] = stage_progress
+    
+    for match in ELAPSED_PATTERN.finditer(text):
+        progress['last_elapsed'] = match.group().strip()
+        if match.group('total'):
+            progress['total_elapsed'] = progress['last_elapsed']
+
+
+def calculate_progress(progress):
     """
     Calculate analysis progress based on completed modules and output.
     Returns (progress_percentage, current_stage, completed_tasks, total_tasks)
     """
-    if not output_text:
-        return 0, "Initializing...", 0, 1
-    
-    # Count completed modules by looking for "Time elapsed for running module" messages
-    completed_modules = []
-    
-    # Parse all completed modules from output
-    for line in output_text.split('\n'):
-        if 'Time elapsed for running module' in line:
-            # Extract module name
-            if '"N_VA_StaticAbsolute"' in line:
-                completed_modules.append('Static Absolute')
-            elif '"N_VA_TennisCourt"' in line:
-                completed_modules.append('Tennis Court')
-            elif '"N_PDP"' in line:
-                completed_modules.append('PDP Calculation')
-            elif '"N_VA_HeatMap"' in line:
-                completed_modules.append('Heatmap')
-            elif '"N_VA_HClust"' in line:
-                completed_modules.append('Hierarchical Clustering')
-            elif '"N_VA_Mds"' in line:
-                completed_modules.append('MDS')
-            elif '"N_VA_TopK"' in line:
-                completed_modules.append('Top-K Analysis')
-            elif '"N_T_OB"' in line:
-                completed_modules.append('Buffer Transform')
-            elif '"N_VA_InequalityMatrices"' in line:
-                completed_modules.append('Inequality Matrices')
-    
-    # Determine current stage
-    if 'ALL PDP PROCESSING COMPLETE' in output_text:
-        current_stage = "✅ Analysis Complete!"
-        progress = 100
-    elif 'STARTING PDP: BUFFER' in output_text:
-        current_stage = "Processing Buffer PDP..."
-        progress = 60
-    elif 'STARTING PDP: FUNDAMENTAL' in output_text:
-        current_stage = "Processing Fundamental PDP..."
-        progress = 30
-    elif 'STARTING ANALYSIS' in output_text:
-        current_stage = "Initializing..."
-        progress = 10
-    else:
-        current_stage = "Starting..."
-        progress = 5
+    percentage = progress['stage_progress']
     
     # Calculate more accurate progress based on completed modules
-    if len(completed_modules) > 0:
+    if progress['modules_run'] > 0:
         # Estimate based on typical run (adjust based on actual modules)
-        progress = min(95, 10 + (len(completed_modules) * 5))
+        percentage = min(95, 10 + (progress['modules_run'] * 5))
     
-    total_modules = len(set(completed_modules))
+    total_modules = len(progress['completed'])
     
-    return progress, current_stage, total_modules, total_modules
+    return percentage, progress['stage'], total_modules, total_modules
 
 
 # Password configuration (you can change this or use environment variable)
@@ -197,133 +394,278 @@ if not check_password():
 
 # Logout button in sidebar
 with st.sidebar:
+    st.toggle("🔍 Show debug information", key='show_debug')
     st.markdown("---")
     if st.button("🚪 Logout", type="secondary", use_container_width=True):
         st.session_state.authenticated = False
         st.rerun()
 
 
-def run_moving_objects_in_background(params):
+def close_log_file():
+    """
+    Closes the log file that is kept open in session state while an analysis runs,
+    and stops watching the results directory.
     """
-    Background worker function that runs N_Moving_Objects with given parameters.
-    Writes output to a log file for real-time monitoring.
+    if st.session_state.log_fh is not None:
+        st.session_state.log_fh.close()
+        st.session_state.log_fh = None
+    stop_results_watcher()
+
+
+def start_results_watcher(results_dir):
     """
+    Starts watching the results directory (requires watchdog). Stores (observer, changed) in session state:
+    `changed` is a threading.Event that is set whenever a file in the directory changes.
+    """
+    stop_results_watcher()
+    if Observer is None:
+        return
+    changed = threading.Event()
+    changed.set()  # read whatever is already there
+    handler = FileSystemEventHandler()
+    handler.on_created = handler.on_modified = handler.on_moved = lambda event: changed.set()
+    observer = Observer()
+    observer.daemon = True
+    observer.schedule(handler, results_dir, recursive=False)
+    observer.start()
+    st.session_state.results_watcher = (observer, changed)
+
+
+def stop_results_watcher():
+    """
+    Stops the watcher of the results directory, if there is one.
+    """
+    if st.session_state.results_watcher is not None:
+        observer, _ = st.session_state.results_watcher
+        observer.stop()
+        st.session_state.results_watcher = None
+
+
+def read_status(results_dir):
+    """
+    Returns the status dict from analysis_status.json, or None if there is no status file yet.
+    The file is only parsed again when it has been replaced since the previous rerun.
+    """
+    status_file_path = os.path.join(results_dir, STATUS_FILE_NAME)
     try:
-        # Get results dir first
-        results_dir = params.get('results_dir', os.getcwd())
-        os.makedirs(results_dir, exist_ok=True)
-        
-        # Create status and log files
-        log_file_path = os.path.join(results_dir, 'analysis_log.txt')
-        status_file_path = os.path.join(results_dir, 'analysis_status.txt')
-        
-        # Write initial status
-        with open(status_file_path, 'w', encoding='utf-8') as f:
-            f.write('running')
-        
-        with open(log_file_path, 'w', encoding='utf-8') as debug_log:
-            debug_log.write("="*60 + "\n")
-            debug_log.write("🔍 DEBUG: Function started\n")
-            debug_log.write(f"📂 Results dir: {results_dir}\n")
-            debug_log.write(f"📊 Dataset param: {params.get('dataset_name', 'N_C_Dataset.csv')}\n")
-            debug_log.write(f"🗂️ Current working dir: {os.getcwd()}\n")
-            debug_log.write("="*60 + "\n")
-        
-        # Validate dataset file exists
-        dataset_name = params.get('dataset_name', 'N_C_Dataset.csv')
-        if not os.path.isfile(dataset_name):
-            with open(log_file_path, 'a', encoding='utf-8') as debug_log:
-                debug_log.write(f'❌ ERROR: Dataset file not found: {dataset_name}\n')
-                debug_log.write(f'📂 Looking in: {os.path.abspath(dataset_name)}\n')
-            with open(status_file_path, 'w', encoding='utf-8') as f:
-                f.write('error')
-            return
-        
-        # Set environment variables for av module
-        if 'dataset_name' in params:
-            os.environ['AV_DATASET'] = params['dataset_name']
+        stat = os.stat(status_file_path)
+    except FileNotFoundError:
+        return None
+    
+    # os.replace gives the file a new inode, so (path, inode, mtime, size) identifies one write
+    status_key = (status_file_path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if st.session_state.status_cache is None or st.session_state.status_cache[0] != status_key:
+        with open(status_file_path, 'r', encoding='utf-8') as f:
+            st.session_state.status_cache = (status_key, json.load(f))
+    return st.session_state.status_cache[1]
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def list_dir_cached(path, mtime_ns):
+    """
+    Returns the names in a directory. Cached on the directory mtime, which changes when entries are added or removed.
+    """
+    return os.listdir(path)
+
+
+def list_results_dir():
+    """
+    Returns the names in the results directory of the current run, or None if there is none (yet).
+    One stat per rerun replaces the separate exists checks and directory listings.
+    """
+    results_dir = st.session_state.results_directory
+    if not results_dir:
+        return None
+    try:
+        mtime_ns = os.stat(results_dir).st_mtime_ns
+    except OSError:
+        return None
+    return list_dir_cached(results_dir, mtime_ns)
+
+
+def scan_files(path):
+    """
+    Yields a DirEntry for every file below `path`, recursing into subdirectories.
+    DirEntry caches its name, path and stat result, so each file costs one stat at most.
+    A directory that disappears while it is being scanned is skipped.
+    """
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from scan_files(entry.path)
+                else:
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def collect_results(path, mtime_ns):
+    """
+    Walks the results directory and sorts the images into the viewer categories.
+    Returns (visualization_files, all_files_for_download, total_size).
+    Cached on the mtime of the results directory; every run replaces the status file there, which updates it.
+    """
+    # Collect all PNG files
+    visualization_files = {
+        'Static Absolute': [],
+        'Heatmaps': [],
+        'Hierarchical Clustering': [],
+        'MDS': [],
+        'Top-K': [],
+        'Tennis Court': [],
+        'Inequality Matrices': [],
+        'Other': []
+    }
+    
+    all_files_for_download = []
+    total_size = 0
+    
+    # Entry paths are built by joining onto `path`, so the relative path is what follows this prefix
+    prefix_len = len(os.path.join(path, ''))
+    for entry in scan_files(path):
+        file, file_path = entry.name, entry.path
+        rel_path = file_path[prefix_len:]
+        file_lower = file.lower()
         
-        os.environ['AV_RESULTS_DIR'] = results_dir
+        # Skip Python scripts and debug files
+        if file_lower.endswith('.py') or file_lower == '_button_clicked.txt':
+            continue
         
-        # Allow av to load dataset now
-        os.environ['AV_SKIP_LOAD'] = '0'
+        all_files_for_download.append((rel_path, file_path))
+        total_size += entry.stat().st_size
         
-        # Open log file for writing
-        log_file = open(log_file_path, 'a', encoding='utf-8', buffering=1)
+        # Categorize PNG images for display
+        if file_lower.endswith(('.png', '.jpg', '.jpeg')):
+            match = RESULT_CATEGORY_PATTERN.match(rel_path)
+            category = RESULT_CATEGORIES[match.lastindex - 1][0] if match else 'Other'
+            visualization_files[category].append((file, rel_path, file_path))
+
+    return visualization_files, all_files_for_download, total_size
+
+
+def collect_results_dir():
+    """
+    Returns collect_results() for the results directory of the current run, or None if there is none.
+    """
+    results_dir = st.session_state.results_directory
+    if not results_dir:
+        return None
+    try:
+        mtime_ns = os.stat(results_dir).st_mtime_ns
+    except OSError:
+        return None
+    return collect_results(results_dir, mtime_ns)
+
+
+def build_results_zip(files):
+    """
+    Packs (rel_path, full_path) pairs into a ZIP archive and returns its bytes.
+    Images are already compressed and are stored as-is; other results (CSV, HTML, logs) are deflated.
+    The archive is built in a temporary file, so only the returned bytes are held in memory
+    (a BytesIO would hold the archive twice while getvalue() copies it).
+    """
+    import tempfile
+    import zipfile
+
+    with tempfile.TemporaryFile() as zip_tmp:
+        with zipfile.ZipFile(zip_tmp, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for rel_path, full_path in files:
+                stored = full_path.lower().endswith(('.png', '.jpg', '.jpeg'))
+                zip_file.write(full_path, rel_path, compress_type=zipfile.ZIP_STORED if stored else None)
+        zip_tmp.seek(0)
+        return zip_tmp.read()
+
+
+def show_log_tail():
+    """
+    Shows the end of the analysis log, with a button to download the full log file.
+    Only the tail is sent to the browser on each rerun; the file is read when the button is clicked.
+    """
+    st.code(st.session_state.last_output[-LOG_TAIL_CHARS:], language='text')
+    log_path = Path(st.session_state.results_directory, 'analysis_log.txt')
+    if log_path.is_file():
+        st.download_button(
+            label="📥 Download full log",
+            data=log_path.read_bytes,
+            file_name='analysis_log.txt',
+            mime='text/plain'
+        )
+
+
+def start_analysis(params):
+    """
+    Starts N_Moving_Objects in a separate Python process with the given parameters.
+    The process writes its output straight to analysis_log.txt for real-time monitoring.
+    Returns the Popen object, or None if the analysis could not be started.
+    """
+    import subprocess
+    
+    results_dir = params['results_dir']
+    os.makedirs(results_dir, exist_ok=True)
+    
+    # Create status and log files
+    log_file_path = os.path.join(results_dir, 'analysis_log.txt')
+    dataset_name = params['dataset_name']
+    
+    # One handle for the whole log: the GUI writes the header, the analysis process inherits it for its output.
+    # O_APPEND keeps every write at the end of the file, whichever process makes it.
+    log_fd = os.open(log_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+    with os.fdopen(log_fd, 'w', encoding='utf-8', buffering=LOG_FILE_BUFFER_SIZE) as log_file:
+        header = []
+        if SAM_DEBUG:
+            header += [
+                "="*60,
+                "🔍 DEBUG: Function started",
+                f"📂 Results dir: {results_dir}",
+                f"📊 Dataset param: {dataset_name}",
+                f"🗂️ Current working dir: {os.getcwd()}",
+                "="*60,
+            ]
         
-        # Redirect stdout and stderr to log file
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
+        # Validate dataset file exists
+        if not os.path.isfile(dataset_name):
+            header.append(f'❌ ERROR: Dataset file not found: {dataset_name}')
+            log_file.write('\n'.join(header) + '\n')
+            write_status(results_dir, 'error')
+            return None
         
-        class LogWriter:
-            def __init__(self, log_file, original):
-                self.log_file = log_file
-                self.original = original
-                
-            def write(self, text):
-                self.log_file.write(text)
-                self.log_file.flush()
-                
-            def flush(self):
-                self.log_file.flush()
+        header += [
+            "="*60,
+            "🚀 STARTING ANALYSIS",
+            "="*60,
+            f"📊 Dataset: {dataset_name}",
+            f"📂 Results: {results_dir}",
+            "="*60,
+        ]
+        # Written in one go, before the analysis process starts writing to the same file
+        log_file.write('\n'.join(header) + '\n')
+        log_file.flush()
         
-        sys.stdout = LogWriter(log_file, old_stdout)
-        sys.stderr = LogWriter(log_file, old_stderr)
+        # N_Moving_Objects loads the dataset and applies the parameters (AV_PARAMS) through av.load_dataset
+        # and av.configure, so av must not load its default dataset on import. AV_DATASET is still set:
+        # N_T_OB reads it, and an inherited value would point it to another dataset
+        env = {
+            **os.environ,
+            'AV_RESULTS_DIR': results_dir,
+            'AV_DATASET': dataset_name,
+            'AV_SKIP_LOAD': '1',
+            'AV_PARAMS': json.dumps(params),
+        }
         
-        try:
-            print("="*60)
-            print("🚀 STARTING ANALYSIS")
-            print("="*60)
-            print(f"📊 Dataset: {params.get('dataset_name', 'N_C_Dataset.csv')}")
-            print(f"📂 Results: {results_dir}")
-            print("="*60)
-            
-            # Reload av so it processes the dataset with the provided environment
-            import importlib
-            importlib.reload(av)
-            
-            # Apply all parameters to av module
-            for key, value in params.items():
-                if hasattr(av, key):
-                    setattr(av, key, value)
-            
-            print(f'✅ Configuration loaded successfully')
-            print(f'🔢 Configurations: {av.con}, Timestamps: {av.tst}, Points: {av.poi}')
-            print('='*60)
-            
-            # Import and run N_Moving_Objects
-            import N_Moving_Objects
-            importlib.reload(N_Moving_Objects)
-            
-            print('\n✅ Analysis completed successfully!')
-            with open(status_file_path, 'w', encoding='utf-8') as f:
-                f.write('finished')
-                
-        except Exception as e:
-            print(f'\n❌ ERROR during analysis:\n{str(e)}')
-            import traceback
-            traceback.print_exc()
-            with open(status_file_path, 'w', encoding='utf-8') as f:
-                f.write('error')
-        
-        finally:
-            # Restore stdout/stderr
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
-            log_file.close()
-        
-    except Exception as e:
-        # Critical error - write to status file if possible
-        try:
-            status_file_path = os.path.join(params.get('results_dir', os.getcwd()), 'analysis_status.txt')
-            with open(status_file_path, 'w', encoding='utf-8') as f:
-                f.write('error')
-        except:
-            pass
+        # The process shares the log file, so its output goes straight to disk (no pipe)
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'N_Moving_Objects'],
+            cwd=SAM_DIR,
+            env=env,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            bufsize=-1
+        )
     
-    finally:
-        # Reset environment
-        os.environ['AV_SKIP_LOAD'] = '1'
+    write_status(results_dir, 'running', pid=process.pid)
+    return process
 
 
 # ============================================================================
@@ -355,21 +697,21 @@ with col1:
     st.checkbox("🔹 Fundamental (required)", value=True, disabled=True, key='pdp_fundamental')
     
     # Optional PDP types
-    pdp_buffer = st.checkbox("🔸 Buffer", value=getattr(av, 'PDPg_buffer', 1) == 1, key='pdp_buffer')
-    pdp_rough = st.checkbox("🔶 Rough", value=getattr(av, 'PDPg_rough', 0) == 1, key='pdp_rough')
-    pdp_bufferrough = st.checkbox("🔷 Buffer + Rough", value=getattr(av, 'PDPg_bufferrough', 0) == 1, key='pdp_bufferrough')
+    pdp_buffer = st.checkbox("🔸 Buffer", value=av_defaults['PDPg_buffer'] == 1, key='pdp_buffer')
+    pdp_rough = st.checkbox("🔶 Rough", value=av_defaults['PDPg_rough'] == 1, key='pdp_rough')
+    pdp_bufferrough = st.checkbox("🔷 Buffer + Rough", value=av_defaults['PDPg_bufferrough'] == 1, key='pdp_bufferrough')
     
     st.markdown("### 🔢 Core Parameters")
-    window_length_tst = st.number_input("⏱️ window_length_tst", value=getattr(av, 'window_length_tst', 3), min_value=1, step=1)
+    window_length_tst = st.number_input("⏱️ window_length_tst", value=av_defaults['window_length_tst'], min_value=1, step=1)
     
     st.markdown("### 📏 Buffer / Rough Parameters")
     col1a, col1b = st.columns(2)
     with col1a:
-        buffer_x = st.number_input("↔️ buffer_x", value=getattr(av, 'buffer_x', 1), disabled=not pdp_buffer and not pdp_bufferrough)
-        rough_x = st.number_input("↔️ rough_x", value=getattr(av, 'rough_x', 0), disabled=not pdp_rough and not pdp_bufferrough)
+        buffer_x = st.number_input("↔️ buffer_x", value=av_defaults['buffer_x'], disabled=not pdp_buffer and not pdp_bufferrough)
+        rough_x = st.number_input("↔️ rough_x", value=av_defaults['rough_x'], disabled=not pdp_rough and not pdp_bufferrough)
     with col1b:
-        buffer_y = st.number_input("↕️ buffer_y", value=getattr(av, 'buffer_y', 1), disabled=not pdp_buffer and not pdp_bufferrough)
-        rough_y = st.number_input("↕️ rough_y", value=getattr(av, 'rough_y', 0), disabled=not pdp_rough and not pdp_bufferrough)
+        buffer_y = st.number_input("↕️ buffer_y", value=av_defaults['buffer_y'], disabled=not pdp_buffer and not pdp_bufferrough)
+        rough_y = st.number_input("↕️ rough_y", value=av_defaults['rough_y'], disabled=not pdp_rough and not pdp_bufferrough)
 
 # ============================================================================
 # COLUMN 2: Visualization & Analysis Modules
@@ -378,47 +720,33 @@ with col2:
     st.markdown("### 🎨 Visualization & Analysis Modules")
     
     # Create multiselect for all modules
-    module_options = {
-        'N_PDP': 'PDP Calculation (Distance Matrices)',
-        'N_VA_StaticAbsolute': 'Static Absolute',
-        'N_VA_HeatMap': 'Heatmap',
-        'N_VA_HClust': 'Hierarchical Clustering',
-        'N_VA_Mds': 'MDS',
-        'N_VA_InequalityMatrices': 'Inequality Matrices',
-        'N_VA_TopK': 'Top K',
-        'N_VA_TennisCourt': '🎾 Tennis Court',
-    }
-    
     # Get default selected modules
-    default_selected = [k for k, v in module_options.items() if getattr(av, k, 0) == 1]
+    default_selected = get_default_modules(tuple(MODULE_OPTIONS))
     
     selected_modules = st.multiselect(
         "Select modules to run:",
-        options=list(module_options.keys()),
+        options=list(MODULE_OPTIONS),
         default=default_selected,
-        format_func=lambda x: module_options[x]
+        format_func=MODULE_OPTIONS.get
     )
     
     st.markdown("### 💾 Dataset & Output")
     
     # Dataset file selection
     dataset_name = st.text_input("📁 Dataset file (CSV path)", 
-                                 value=getattr(av, 'dataset_name', 'N_C_Dataset.csv'),
+                                 value=av_defaults['dataset_name'],
                                  help="Enter full path to CSV file or use file uploader below")
     
     # File uploader as alternative to text input
     uploaded_file = st.file_uploader("Or upload a CSV file", type=['csv'], key='dataset_uploader')
     if uploaded_file is not None:
-        # Save uploaded file to temp location
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            dataset_name = tmp_file.name
-            st.success(f"✅ File uploaded: {uploaded_file.name}")
+        # Save uploaded file to temp location (once per file contents)
+        dataset_name = materialize_upload(uploaded_file)
+        st.success(f"✅ File uploaded: {uploaded_file.name}")
     
     # Results directory selection
     results_dir = st.text_input("📂 Results directory", 
-                                value=os.environ.get('AV_RESULTS_DIR', os.getcwd()),
+                                value=DEFAULT_RESULTS_DIR,
                                 help="Enter full path to output directory")
     
     # Quick path suggestions
@@ -426,16 +754,14 @@ with col2:
         col1, col2 = st.columns(2)
         with col1:
             if st.button("📁 Current Directory"):
-                st.info(f"Current: {os.getcwd()}")
+                st.info(f"Current: {CURRENT_DIR}")
             if st.button("📁 User Home"):
-                st.info(f"Home: {os.path.expanduser('~')}")
+                st.info(f"Home: {HOME_DIR}")
         with col2:
             if st.button("📁 Desktop"):
-                desktop = os.path.join(os.path.expanduser('~'), 'Desktop')
-                st.info(f"Desktop: {desktop}")
+                st.info(f"Desktop: {DESKTOP_DIR}")
             if st.button("📁 Documents"):
-                docs = os.path.join(os.path.expanduser('~'), 'Documents')
-                st.info(f"Documents: {docs}")
+                st.info(f"Documents: {DOCUMENTS_DIR}")
 
 # ============================================================================
 # COLUMN 3: Advanced Settings
@@ -443,28 +769,28 @@ with col2:
 with col3:
     with st.expander("⚙️ Advanced Settings", expanded=False):
         st.markdown("### 🎞️ Interpolation")
-        num_frames = st.number_input("num_frames", value=getattr(av, 'num_frames', 20), min_value=1)
+        num_frames = st.number_input("num_frames", value=av_defaults['num_frames'], min_value=1)
         
         st.markdown("### 🗺️ Spatial Bounds")
         col3a, col3b = st.columns(2)
         with col3a:
-            min_boundary_x = st.number_input("⬅️ min_x", value=getattr(av, 'min_boundary_x', -5))
-            min_boundary_y = st.number_input("⬇️ min_y", value=getattr(av, 'min_boundary_y', -5))
+            min_boundary_x = st.number_input("⬅️ min_x", value=av_defaults['min_boundary_x'])
+            min_boundary_y = st.number_input("⬇️ min_y", value=av_defaults['min_boundary_y'])
         with col3b:
-            max_boundary_x = st.number_input("➡️ max_x", value=getattr(av, 'max_boundary_x', 15))
-            max_boundary_y = st.number_input("⬆️ max_y", value=getattr(av, 'max_boundary_y', 30))
+            max_boundary_x = st.number_input("➡️ max_x", value=av_defaults['max_boundary_x'])
+            max_boundary_y = st.number_input("⬆️ max_y", value=av_defaults['max_boundary_y'])
         
         st.markdown("### 🔧 Other Parameters")
-        DD = st.number_input("📐 DD", value=getattr(av, 'DD', 2), min_value=1)
-        des = st.number_input("📊 des", value=getattr(av, 'des', 2), min_value=1)
-        dim = st.number_input("📏 dim", value=getattr(av, 'dim', 2), min_value=1)
+        DD = st.number_input("📐 DD", value=av_defaults['DD'], min_value=1)
+        des = st.number_input("📊 des", value=av_defaults['des'], min_value=1)
+        dim = st.number_input("📏 dim", value=av_defaults['dim'], min_value=1)
         
         num_similar_configurations = st.number_input("🔢 num_similar_configurations", 
-                                                     value=getattr(av, 'num_similar_configurations', 5), min_value=1)
+                                                     value=av_defaults['num_similar_configurations'], min_value=1)
         new_configuration_step = st.number_input("➕ new_configuration_step", 
-                                                 value=getattr(av, 'new_configuration_step', 3), min_value=1)
+                                                 value=av_defaults['new_configuration_step'], min_value=1)
         division_factor = st.number_input("➗ division_factor", 
-                                         value=getattr(av, 'division_factor', 5), min_value=1)
+                                         value=av_defaults['division_factor'], min_value=1)
 
 # ============================================================================
 # RUN CONTROL SECTION
@@ -477,6 +803,7 @@ col_run1, col_run2, col_run3, col_run4 = st.columns(4)
 with col_run1:
     if st.button("▶️ Run Analysis", type="primary", use_container_width=True):
         # Build params dictionary
+        selected_set = frozenset(selected_modules)
         params = {
             # PDP types
             'PDPg_fundamental': 1,
@@ -489,51 +816,45 @@ with col_run1:
             'PDPg_bufferrough_active': 1 if pdp_bufferrough else 0,
             
             # Visualization modules
-            **{k: (1 if k in selected_modules else 0) for k in module_options.keys()},
+            **{k: (1 if k in selected_set else 0) for k in MODULE_OPTIONS},
             
             # Auto-enable dependencies
-            'N_PDP': 1 if any(mod in selected_modules for mod in ['N_VA_HeatMap', 'N_VA_HClust', 'N_VA_Mds', 'N_VA_TopK', 'N_VA_InequalityMatrices']) else (1 if 'N_PDP' in selected_modules else 0),
+            'N_PDP': 1 if (selected_set & N_PDP_DEPENDENTS) or 'N_PDP' in selected_set else 0,
             
-            # Numeric parameters
-            'window_length_tst': int(window_length_tst),
-            'num_frames': int(num_frames),
-            'buffer_x': int(buffer_x),
-            'buffer_y': int(buffer_y),
-            'rough_x': int(rough_x),
-            'rough_y': int(rough_y),
-            'min_boundary_x': int(min_boundary_x),
-            'max_boundary_x': int(max_boundary_x),
-            'min_boundary_y': int(min_boundary_y),
-            'max_boundary_y': int(max_boundary_y),
-            'DD': int(DD),
-            'des': int(des),
-            'dim': int(dim),
-            'num_similar_configurations': int(num_similar_configurations),
-            'new_configuration_step': int(new_configuration_step),
-            'division_factor': int(division_factor),
-            'dataset_name': dataset_name,
-            'results_dir': results_dir
+            # Absolute paths: the analysis process runs from the SAM folder
+            'dataset_name': os.path.abspath(dataset_name),
+            'results_dir': os.path.abspath(results_dir)
         }
         
-        # Start analysis in background thread
-        if st.session_state.run_thread is None or not st.session_state.run_thread.is_alive():
+        # Numeric parameters (same order as NUMERIC_PARAMS)
+        numeric_values = (
+            window_length_tst, num_frames,
+            buffer_x, buffer_y, rough_x, rough_y,
+            min_boundary_x, max_boundary_x, min_boundary_y, max_boundary_y,
+            DD, des, dim,
+            num_similar_configurations, new_configuration_step, division_factor,
+        )
+        params.update(zip(NUMERIC_PARAMS, map(int, numeric_values)))
+        
+        # Start analysis in a separate process
+        process = st.session_state.run_process
+        if process is None or process.poll() is not None:
             st.session_state.stop_requested = False
             st.session_state.analysis_params = params  # Store params for progress tracking
-            st.session_state.results_directory = results_dir  # Store results directory
+            st.session_state.results_directory = params['results_dir']  # Store results directory
             
-            st.session_state.run_thread = threading.Thread(
-                target=run_moving_objects_in_background, 
-                args=(params,), 
-                daemon=True
-            )
-            st.session_state.run_thread.start()
-            st.success("✅ Analysis started in background!")
-            st.info(f"📂 Results will be saved to: {results_dir}")
+            # Start reading the new log from the beginning
+            close_log_file()
+            st.session_state.log_offset = 0
+            st.session_state.log_decoder.reset()
+            st.session_state.last_output = ''
+            st.session_state.progress = new_progress()
             
-            # Initialize status tracking
-            status_file = os.path.join(results_dir, 'analysis_status.txt')
-            with open(status_file, 'w', encoding='utf-8') as f:
-                f.write('starting')
+            st.session_state.run_process = start_analysis(params)
+            if st.session_state.run_process is not None:
+                start_results_watcher(params['results_dir'])
+                st.success("✅ Analysis started in background!")
+                st.info(f"📂 Results will be saved to: {results_dir}")
             
             time.sleep(0.5)
             st.rerun()
@@ -543,7 +864,9 @@ with col_run1:
 with col_run2:
     if st.button("⏹️ Stop Analysis", type="secondary", use_container_width=True):
         st.session_state.stop_requested = True
-        st.warning("⏹️ Stop requested. Waiting for safe termination point...")
+        if st.session_state.run_process is not None and st.session_state.run_process.poll() is None:
+            st.session_state.run_process.terminate()
+        st.warning("⏹️ Stop requested. Waiting for the analysis process to exit...")
         time.sleep(0.5)
         st.rerun()
 
@@ -561,16 +884,27 @@ with col_run4:
         ))
         
         if os.path.exists(viewer_path):
-            env = os.environ.copy()
+            import subprocess
+            # Only the variables the viewer needs, instead of a copy of the whole environment
+            env = {key: os.environ[key] for key in VIEWER_ENV_KEYS if key in os.environ}
             env['AV_RESULTS_DIR'] = results_dir
             env['AV_DATASET'] = dataset_name
             
             try:
-                subprocess.Popen(
-                    [sys.executable, '-m', 'streamlit', 'run', viewer_path],
-                    env=env,
-                    creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == 'win32' else 0
-                )
+                # The viewer writes its output to viewer.log instead of the console of this app;
+                # the child keeps its own copy of the file handle, so ours can be closed right away
+                os.makedirs(results_dir, exist_ok=True)
+                with open(os.path.join(results_dir, 'viewer.log'), 'ab', buffering=LOG_FILE_BUFFER_SIZE) as viewer_log:
+                    subprocess.Popen(
+                        [sys.executable, '-m', 'streamlit', 'run', viewer_path],
+                        env=env,
+                        stdout=viewer_log,
+                        stderr=subprocess.STDOUT,
+                        bufsize=-1,
+                        close_fds=True,
+                        # No console window needed on Windows: the output goes to viewer.log
+                        creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+                    )
                 st.success(f"✅ Results viewer launched! Check your browser.")
             except Exception as e:
                 st.error(f"❌ Could not launch viewer: {e}")
@@ -580,200 +914,229 @@ with col_run4:
 # ============================================================================
 # STATUS DISPLAY
 # ============================================================================
-st.markdown("---")
-st.markdown("### 📊 Analysis Status")
+def show_status_panel(auto_refresh):
+    """
+    Shows the analysis status, progress and log. While an analysis runs this is a fragment that
+    refreshes itself every REFRESH_INTERVAL seconds, so the rest of the page is not rerun.
+    """
+    st.markdown("---")
+    st.markdown("### 📊 Analysis Status")
 
-# EXTENSIVE DEBUGGING
-st.markdown("#### 🔍 Debug Information")
-debug_col1, debug_col2 = st.columns(2)
-with debug_col1:
-    st.write(f"**Results Dir Set:** {st.session_state.results_directory is not None}")
-    if st.session_state.results_directory:
-        st.write(f"**Results Dir:** `{st.session_state.results_directory}`")
-        st.write(f"**Dir Exists:** {os.path.exists(st.session_state.results_directory)}")
-with debug_col2:
-    st.write(f"**Analysis Params Set:** {st.session_state.analysis_params is not None}")
-    st.write(f"**Thread Alive:** {st.session_state.run_thread is not None and st.session_state.run_thread.is_alive() if st.session_state.run_thread else False}")
+    # Contents of the results directory (None if it does not exist), used by the sections below
+    results_files = list_results_dir()
 
-# Read status from file if analysis was started
-current_status = 'idle'
-status_file_exists = False
-log_file_exists = False
+    # Debug information, collected here and shown as one block (sidebar toggle)
+    debug_lines = [f"- **Results Dir Set:** {st.session_state.results_directory is not None}"]
+    if st.session_state.results_directory:
+        debug_lines.append(f"- **Results Dir:** `{st.session_state.results_directory}`")
+        debug_lines.append(f"- **Dir Exists:** {results_files is not None}")
+    debug_lines.append(f"- **Analysis Params Set:** {st.session_state.analysis_params is not None}")
+    debug_lines.append(f"- **Process Running:** {st.session_state.run_process is not None and st.session_state.run_process.poll() is None}")
 
-if st.session_state.results_directory and os.path.exists(st.session_state.results_directory):
-    status_file = os.path.join(st.session_state.results_directory, 'analysis_status.txt')
-    log_file = os.path.join(st.session_state.results_directory, 'analysis_log.txt')
-    
-    status_file_exists = os.path.exists(status_file)
-    log_file_exists = os.path.exists(log_file)
-    
-    st.write(f"**Status File Exists:** {status_file_exists}")
-    st.write(f"**Log File Exists:** {log_file_exists}")
-    
-    if status_file_exists:
+    # The analysis process records 'finished' or 'error' itself; once it has exited, record a stop,
+    # or an error if it was killed before it could write its status
+    if st.session_state.run_process is not None and st.session_state.run_process.poll() is not None:
+        returncode = st.session_state.run_process.returncode
+        results_dir = st.session_state.results_directory
         try:
-            with open(status_file, 'r', encoding='utf-8') as f:
-                current_status = f.read().strip()
-                st.write(f"**Status from file:** `{current_status}`")
-        except Exception as e:
-            st.error(f"Error reading status: {e}")
-            current_status = 'error'
-    
-    # Read log output
-    if log_file_exists:
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                st.session_state.last_output = f.read()
-                st.write(f"**Log size:** {len(st.session_state.last_output)} chars")
-        except Exception as e:
-            st.error(f"Error reading log: {e}")
-    
-    # Update analysis_finished flag
-    if current_status == 'finished':
-        st.session_state.analysis_finished = True
-        st.session_state.last_status = 'finished'
-    elif current_status == 'error':
-        st.session_state.last_status = 'error'
-    elif current_status == 'running':
-        st.session_state.last_status = 'running'
-else:
-    current_status = st.session_state.last_status
-    st.write(f"**Using session status:** `{current_status}`")
+            if returncode != 0 and st.session_state.stop_requested:
+                write_status(results_dir, 'stopped', returncode=returncode)
+            elif returncode != 0 and (read_status(results_dir) or {}).get('status') == 'running':
+                write_status(results_dir, 'error', returncode=returncode)
+        except (OSError, ValueError) as e:
+            st.error(f"Error writing status: {e}")
+        st.session_state.run_process = None
 
-st.markdown("---")
+    # Read status from file if analysis was started
+    current_status = 'idle'
+    status_file_exists = False
+    log_file_exists = False
 
-# Status indicator
-status_emoji = {
-    'idle': '💤',
-    'starting': '🔄',
-    'running': '⚙️',
-    'finished': '✅',
-    'stopped': '⏹️',
-    'error': '❌'
-}
+    if results_files is not None:
+        log_file = os.path.join(st.session_state.results_directory, 'analysis_log.txt')
+        
+        if st.session_state.run_process is not None:
+            # Our own analysis process is still alive (an exited one was reaped above):
+            # the status is known without touching the status file on every refresh
+            status_info = {'status': 'running'}
+        else:
+            # The status file is replaced atomically, so it is always complete
+            try:
+                status_info = read_status(st.session_state.results_directory)
+            except (OSError, ValueError) as e:
+                st.error(f"Error reading status: {e}")
+                status_info = {'status': 'error'}
+        status_file_exists = status_info is not None
+        
+        # Keep the log open between reruns; fstat gives its size without another lookup by path
+        if st.session_state.log_fh is None:
+            try:
+                st.session_state.log_fh = open(log_file, 'rb')
+            except FileNotFoundError:
+                pass
+        log_file_exists = st.session_state.log_fh is not None
+        
+        debug_lines.append(f"- **Status File Exists:** {status_file_exists}")
+        debug_lines.append(f"- **Log File Exists:** {log_file_exists}")
+        
+        if status_file_exists:
+            current_status = status_info['status']
+            debug_lines.append(f"- **Status from file:** `{current_status}`")
+        
+        # Read log output (only the bytes written since the previous rerun). With a watcher the log is
+        # only checked after a change in the results directory, and always once the analysis has ended.
+        watcher = st.session_state.results_watcher
+        log_changed = watcher is None or watcher[1].is_set() or current_status in ('finished', 'error', 'stopped')
+        if log_file_exists and log_changed:
+            if watcher is not None:
+                watcher[1].clear()
+            try:
+                log_fh = st.session_state.log_fh
+                log_size = os.fstat(log_fh.fileno()).st_size
+                if log_size < st.session_state.log_offset:
+                    # Log was rewritten by a new run: start reading from the beginning
+                    st.session_state.log_offset = 0
+                    st.session_state.log_decoder.reset()
+                    st.session_state.last_output = ''
+                    st.session_state.progress = new_progress()
+                if log_size > st.session_state.log_offset:
+                    log_fh.seek(st.session_state.log_offset)
+                    chunk = log_fh.read(log_size - st.session_state.log_offset)
+                    st.session_state.log_offset += len(chunk)
+                    new_output = st.session_state.log_decoder.decode(chunk)
+                    st.session_state.last_output = (st.session_state.last_output + new_output)[-LOG_MAX_CHARS:]
+                    update_progress(st.session_state.progress, new_output)
+            except Exception as e:
+                st.error(f"Error reading log: {e}")
+            
+            # The analysis has ended: everything has been read, so the log can be closed
+            if current_status in ('finished', 'error', 'stopped'):
+                close_log_file()
+        if log_file_exists:
+            debug_lines.append(f"- **Log size:** {st.session_state.log_offset} bytes")
+        
+        # Update analysis_finished flag
+        if current_status == 'finished':
+            st.session_state.analysis_finished = True
+            st.session_state.last_status = 'finished'
+        elif current_status == 'error':
+            st.session_state.last_status = 'error'
+        elif current_status == 'running':
+            st.session_state.last_status = 'running'
+    else:
+        current_status = st.session_state.last_status
+        debug_lines.append(f"- **Using session status:** `{current_status}`")
 
-status_color = {
-    'idle': 'gray',
-    'starting': 'blue',
-    'running': 'blue',
-    'finished': 'green',
-    'stopped': 'orange',
-    'error': 'red'
-}
+    if st.session_state.show_debug:
+        st.markdown("#### 🔍 Debug Information\n" + "\n".join(debug_lines))
 
-st.markdown(f"**Status:** :{status_color.get(current_status, 'gray')}[{status_emoji.get(current_status, '❓')} {current_status.upper()}]")
+    st.markdown("---")
 
-# Manual refresh button
-if st.button("🔄 Force Refresh", type="secondary"):
-    st.rerun()
+    # Status indicator
+    st.markdown(STATUS_MD.get(current_status) or f"**Status:** :gray[❓ {current_status.upper()}]")
 
-# Show files in results directory if it exists
-if st.session_state.results_directory and os.path.exists(st.session_state.results_directory):
-    with st.expander("📁 Files in Results Directory", expanded=False):
-        try:
-            files = os.listdir(st.session_state.results_directory)
-            st.write(f"**Total files:** {len(files)}")
-            for f in files[:20]:  # Show first 20
+    # Manual refresh button
+    if st.button("🔄 Force Refresh", type="secondary"):
+        st.rerun()
+
+    # Show files in results directory if it exists
+    if results_files is not None:
+        with st.expander("📁 Files in Results Directory", expanded=False):
+            st.write(f"**Total files:** {len(results_files)}")
+            for f in results_files[:20]:  # Show first 20
                 st.text(f"  • {f}")
-            if len(files) > 20:
-                st.text(f"  ... and {len(files) - 20} more")
-        except Exception as e:
-            st.error(f"Error listing files: {e}")
-
-# Show progress bar when running
-# Show progress bar whenever we have analysis params and output (running or finishing)
-if st.session_state.analysis_params and st.session_state.last_output:
-    progress, current_stage, completed, total = calculate_progress(
-        st.session_state.last_output, 
-        st.session_state.analysis_params
-    )
-    
-    st.markdown("### 📊 Progress")
-    
-    # If finished, show 100%, otherwise show calculated progress
-    if current_status == 'finished':
-        st.progress(1.0, text="100% - ✅ Analysis Complete!")
-    else:
-        st.progress(progress / 100, text=f"{progress}% - {current_stage}")
-        
-        # Show detailed module completion
-        if completed > 0:
-            st.caption(f"✅ Completed {completed} unique modules")
-    
-    st.markdown("---")
+            if len(results_files) > 20:
+                st.text(f"  ... and {len(results_files) - 20} more")
 
-# Auto-refresh while running OR if thread is alive but status hasn't updated yet
-should_refresh = (current_status in ['running', 'starting']) or \
-                 (st.session_state.run_thread and st.session_state.run_thread.is_alive())
-
-if should_refresh:
-    # Parse timing information from output
-    time_info = ""
-    if st.session_state.last_output:
-        # Extract elapsed time from last "Time elapsed" line
-        lines = st.session_state.last_output.split('\n')
-        elapsed_times = [l for l in lines if 'Time elapsed for running module' in l or 'Total time elapsed' in l]
-        if elapsed_times:
-            last_time = elapsed_times[-1]
-            time_info = f"⏱️ {last_time.strip()}"
-    
-    # Show live output in expander with time info
-    expander_title = "📟 Live Output Log"
-    if time_info:
-        expander_title += f" - {time_info}"
-    
-    with st.expander(expander_title, expanded=True):
-        if st.session_state.last_output:
-            # Show last 5000 chars for better context
-            output_display = st.session_state.last_output[-5000:]
-            st.code(output_display, language='text')
-            
-            # Add helpful info about progress
-            if 'STARTING PDP: FUNDAMENTAL' in st.session_state.last_output:
-                st.info("🔄 Processing Fundamental PDP - This may take a few minutes...")
-            elif 'STARTING PDP: BUFFER' in st.session_state.last_output:
-                st.info("🔄 Processing Buffer PDP - About halfway through...")
-            elif 'ALL PDP PROCESSING COMPLETE' in st.session_state.last_output:
-                st.success("✅ All processing complete!")
+    # Show progress bar when running
+    # Show progress bar whenever we have analysis params and output (running or finishing)
+    if st.session_state.analysis_params and st.session_state.last_output:
+        progress, current_stage, completed, total = calculate_progress(st.session_state.progress)
+        
+        st.markdown("### 📊 Progress")
+        
+        # If finished, show 100%, otherwise show calculated progress
+        if current_status == 'finished':
+            st.progress(1.0, text="100% - ✅ Analysis Complete!")
         else:
-            st.info("⏳ Waiting for output...")
-    
-    time.sleep(2)  # Refresh every 2 seconds
-    st.rerun()
+            st.progress(progress / 100, text=f"{progress}% - {current_stage}")
+            
+            # Show detailed module completion
+            if completed > 0:
+                st.caption(f"✅ Completed {completed} unique modules")
+        
+        st.markdown("---")
+
+    # Live output while running OR if the process is alive but status hasn't updated yet
+    should_refresh = (current_status in ['running', 'starting']) or \
+                     (st.session_state.run_process is not None and st.session_state.run_process.poll() is None)
+
+    if should_refresh:
+        # Parse timing information from output
+        time_info = ""
+        if st.session_state.progress['last_elapsed']:
+            # Elapsed time from the last "Time elapsed" line (found while reading the log)
+            time_info = f"⏱️ {st.session_state.progress['last_elapsed']}"
+        
+        # Show live output in expander with time info
+        expander_title = "📟 Live Output Log"
+        if time_info:
+            expander_title += f" - {time_info}"
+        
+        with st.expander(expander_title, expanded=True):
+            if st.session_state.last_output:
+                show_log_tail()
+                
+                # Add helpful info about progress (stage found while reading the log)
+                stage_progress = st.session_state.progress['stage_progress']
+                if stage_progress == 100:
+                    st.success("✅ All processing complete!")
+                elif stage_progress == 60:
+                    st.info("🔄 Processing Buffer PDP - About halfway through...")
+                elif stage_progress == 30:
+                    st.info("🔄 Processing Fundamental PDP - This may take a few minutes...")
+            else:
+                st.info("⏳ Waiting for output...")
+
+
+    # Output display (when not running) - Always show if there's output
+    elif st.session_state.last_output:
+        # Determine if we should expand by default
+        expand_by_default = current_status in ['finished', 'error']
+        
+        # Parse timing information from output for finished state
+        time_info = ""
+        if current_status == 'finished' and st.session_state.progress['total_elapsed']:
+            time_info = f" - {st.session_state.progress['total_elapsed']}"
+        
+        expander_title = "📄 Analysis Output Log" + time_info
+        
+        with st.expander(expander_title, expanded=expand_by_default):
+            show_log_tail()
+
+    # The analysis ended during an automatic refresh: rerun the whole page to show the results
+    if auto_refresh and not should_refresh:
+        st.rerun()
 
-# Output display (when not running) - Always show if there's output
-elif st.session_state.last_output:
-    # Determine if we should expand by default
-    expand_by_default = current_status in ['finished', 'error']
-    
-    # Parse timing information from output for finished state
-    time_info = ""
-    if current_status == 'finished':
-        lines = st.session_state.last_output.split('\n')
-        total_time_lines = [l for l in lines if 'Total time elapsed' in l]
-        if total_time_lines:
-            time_info = f" - {total_time_lines[-1].strip()}"
-    
-    expander_title = "📄 Analysis Output Log" + time_info
-    
-    with st.expander(expander_title, expanded=expand_by_default):
-        st.code(st.session_state.last_output, language='text')
+
+# Refresh only the status panel while our analysis process is alive
+analysis_live = st.session_state.run_process is not None
+st.fragment(show_status_panel, run_every=REFRESH_INTERVAL if analysis_live else None)(analysis_live)
 
 # ============================================================================
 # RESULTS VIEWER - VISUALIZATIONS
 # ============================================================================
 # Show results if status is finished OR if we have a results directory with files
 show_results = False
-if current_status == 'finished' and st.session_state.results_directory:
+results = None if analysis_live else collect_results_dir()
+if analysis_live:
+    pass  # results are shown once the analysis has ended
+elif st.session_state.last_status == 'finished' and st.session_state.results_directory:
     show_results = True
-elif st.session_state.results_directory and os.path.exists(st.session_state.results_directory):
-    # Check if there are any PNG files
-    try:
-        files = os.listdir(st.session_state.results_directory)
-        if any(f.lower().endswith('.png') for f in files):
-            show_results = True
-    except:
-        pass
+elif results is not None:
+    # Check if there are any images
+    if any(results[0].values()):
+        show_results = True
 
 if show_results:
     st.markdown("---")
@@ -790,73 +1153,18 @@ if show_results:
     
     browse_results_dir = st.session_state.results_directory
     
-    if os.path.exists(browse_results_dir):
+    if results is not None:
         try:
-            # Collect all PNG files
-            visualization_files = {
-                'Static Absolute': [],
-                'Heatmaps': [],
-                'Hierarchical Clustering': [],
-                'MDS': [],
-                'Top-K': [],
-                'Tennis Court': [],
-                'Inequality Matrices': [],
-                'Other': []
-            }
-            
-            all_files_for_download = []
-            
-            for root, dirs, files in os.walk(browse_results_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, browse_results_dir)
-                    file_lower = file.lower()
-                    
-                    # Skip Python scripts and debug files
-                    if file_lower.endswith('.py') or file_lower == '_button_clicked.txt':
-                        continue
-                    
-                    all_files_for_download.append((rel_path, file_path))
-                    
-                    # Categorize PNG images for display
-                    if file_lower.endswith('.png') or file_lower.endswith('.jpg') or file_lower.endswith('.jpeg'):
-                        # Check if in TennisCourt folder
-                        if 'tenniscourt' in rel_path.lower() or 'tennis_court' in rel_path.lower():
-                            visualization_files['Tennis Court'].append((file, rel_path, file_path))
-                        elif 'static' in file_lower and 'absolute' in file_lower:
-                            visualization_files['Static Absolute'].append((file, rel_path, file_path))
-                        elif 'heatmap' in file_lower:
-                            visualization_files['Heatmaps'].append((file, rel_path, file_path))
-                        elif 'hclust' in file_lower or 'dendrogram' in file_lower or 'cluster' in file_lower:
-                            visualization_files['Hierarchical Clustering'].append((file, rel_path, file_path))
-                        elif 'mds' in file_lower:
-                            visualization_files['MDS'].append((file, rel_path, file_path))
-                        elif 'topk' in file_lower or 'top_k' in file_lower or 'top-k' in file_lower:
-                            visualization_files['Top-K'].append((file, rel_path, file_path))
-                        elif 'tennis' in file_lower or 'court' in file_lower:
-                            visualization_files['Tennis Court'].append((file, rel_path, file_path))
-                        elif 'inequality' in file_lower:
-                            visualization_files['Inequality Matrices'].append((file, rel_path, file_path))
-                        else:
-                            visualization_files['Other'].append((file, rel_path, file_path))
+            visualization_files, all_files_for_download, total_size = results
             
             # Download button at the top
             if all_files_for_download:
-                import zipfile
-                from io import BytesIO
-                
                 col_download, col_info = st.columns([1, 3])
                 with col_download:
-                    # Create ZIP file
-                    zip_buffer = BytesIO()
-                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                        for rel_path, full_path in all_files_for_download:
-                            zip_file.write(full_path, rel_path)
-                    
-                    zip_buffer.seek(0)
+                    # The ZIP file is only built when the button is clicked
                     st.download_button(
                         label="� Download All Results (ZIP)",
-                        data=zip_buffer,
+                        data=lambda: build_results_zip(all_files_for_download),
                         file_name=f"SAM_Results_{time.strftime('%Y%m%d_%H%M%S')}.zip",
                         mime="application/zip",
                         type="primary",
@@ -864,7 +1172,6 @@ if show_results:
                     )
                 
                 with col_info:
-                    total_size = sum(os.path.getsize(fp) for _, fp in all_files_for_download)
                     st.info(f"📊 {len(all_files_for_download)} files ready • 💾 {total_size / 1024 / 1024:.2f} MB total")
             
             st.markdown("---")
@@ -11,46 +11,87 @@
 # Page numbers in reports, etc.
 
 import av  # Import all variables (settings, paths, toggles)
+import atexit
 import importlib
+import json
 import numpy as np
 import pandas as pd
 import shutil
+import signal
 import time
 import os
+import sys
+import threading
 from tqdm import tqdm
 
-t_start = time.time()
+from analysis_status import write_status
 
-# Flag to prevent duplicate timing prints on reload
-_already_printed = getattr(av, '_moving_objects_printed', False)
 
-# Conditionally import visual modules (based on av toggles)
-# Only import modules that exist in SAM folder
-if av.N_VA_StaticAbsolute == 1:
-    try:
-        import N_VA_StaticAbsolute
-    except ImportError:
-        print("⚠️ N_VA_StaticAbsolute not found in SAM folder")
+class BufferedLogStream:
+    """
+    Block-buffered stdout for the GUI log: prints collect in the stream buffer and a
+    background thread flushes them every `interval` seconds, so the live log keeps up
+    without a write to the log file for every printed line.
+    """
 
-if av.N_VA_TennisCourt == 1:
-    try:
-        import N_VA_TennisCourt
-    except ImportError:
-        print("⚠️ N_VA_TennisCourt not found in SAM folder")
+    def __init__(self, stream, interval=0.5):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_every, args=(interval,), daemon=True)
+        self.flusher.start()
+
+    def _flush_every(self, interval):
+        while not self.stopped.wait(interval):
+            self.flush()
+
+    def write(self, text):
+        with self.lock:
+            return self.stream.write(text)
+
+    def flush(self):
+        with self.lock:
+            self.stream.flush()
+
+    def close(self):
+        """Stops the flush thread and writes what is left (before interpreter shutdown)."""
+        self.stopped.set()
+        self.flusher.join()
+        self.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
 
 
 # ---------------- Helper: robust CSV loader (5 columns) ----------------
+# Column types of the PDP datasets; IDs are integers (the buffer dataset writes poiID as e.g. 5.0)
+CONFIG_DTYPES = {'conID': np.int32, 'tstID': np.int32, 'poiID': np.int32, 'x': np.float64, 'y': np.float64}
+
+# Parsed datasets per absolute path, with the (mtime, size) they were read at
+_config_cache = {}
+
+
 def read_config_csv(path):
     """
     Load config CSV that has 5 cols: conID, tstID, poiID, x, y
 
     Returns:
       Df_dataset (5 numeric cols),
-      L_dataset (list of rows),
+      L_dataset (None; the modules that need a list of rows build their own),
       A_dataset (np.float32 array),
       con, tst, poi (counts inferred as max+1)
+
+    The result is cached until the file changes, so the rough variant reuses the fundamental
+    dataset that was already parsed.
     """
-    df = pd.read_csv(path, header=None)
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_cache.get(abs_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    df = pd.read_csv(path, header=None, engine=av.CSV_ENGINE)
     ncols = df.shape[1]
 
     if ncols == 5:
@@ -58,19 +99,19 @@ def read_config_csv(path):
     else:
         raise ValueError(f"Unexpected number of columns ({ncols}) in {path}. Expected 5.")
 
-    # Numeric frame for computations
-    df_num = df[['conID', 'tstID', 'poiID', 'x', 'y']].copy()
-    for c in ['conID', 'tstID', 'poiID', 'x', 'y']:
-        df_num[c] = pd.to_numeric(df_num[c], errors='raise')
+    # Numeric frame for computations, cast in one pass (raises on non-numeric values)
+    df_num = df.astype(CONFIG_DTYPES)
 
-    L_dataset = df_num.values.tolist()
+    L_dataset = None
     A_dataset = df_num.to_numpy(dtype=np.float32)
 
     con = int(df_num['conID'].max()) + 1 if len(df_num) else 0
     tst = int(df_num['tstID'].max()) + 1 if len(df_num) else 0
     poi = int(df_num['poiID'].max()) + 1 if len(df_num) else 0
 
-    return df_num, L_dataset, A_dataset, con, tst, poi
+    result = (df_num, L_dataset, A_dataset, con, tst, poi)
+    _config_cache[abs_path] = (stamp, result)
+    return result
 
 
 # ---------------- Optional: legacy wrapper kept minimal ----------------
@@ -87,95 +128,64 @@ def SetDataForPDPType(data_filename, D_point_mapping, curr_point_id, window_leng
     return Df_dataset, A_dataset, con, tst, poi
 
 
-# ---------------- PDP: Fundamental ----------------
-if av.PDPg_fundamental == 1:
-    print("\n" + "="*60)
-    print("🚀 STARTING PDP: FUNDAMENTAL")
-    print("="*60)
-    av.PDPg_fundamental_active = 1
+# ---------------- Helper: run an analysis module ----------------
+def run_module(name):
+    """
+    Runs an analysis module: imports it (once) and calls its run(), which reads the settings in av.
+    """
+    importlib.import_module(name).run()
 
-    # Copy the active dataset to results directory
-    results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-    os.makedirs(results_dir, exist_ok=True)
-    pdp_dataset_path = os.path.join(results_dir, "N_C_PDPg_fundamental_Dataset.csv")
-    
-    # Only copy if source and destination are different
-    if os.path.abspath(av.dataset_name) != os.path.abspath(pdp_dataset_path):
-        shutil.copyfile(av.dataset_name, pdp_dataset_path)
-    
-    av.dataset_name = pdp_dataset_path
-    av.dataset_name_exclusive = os.path.splitext(av.dataset_name)[0]
-
-    # Robust read (handles 5 columns)
-    (
-        av.Df_dataset,
-        av.L_dataset,
-        av.A_dataset,
-        av.con,
-        av.tst,
-        av.poi,
-    ) = read_config_csv(pdp_dataset_path)
-
-    # Standard export retained (write into results dir if provided)
+
+# ---------------- Analysis run ----------------
+def run():
+    """
+    Runs the analysis with the current settings in av: the visual modules, then every selected PDP variant.
+    The dataset must be loaded in av (av.load_dataset) before calling this.
+    """
+    t_start = time.time()
+
+    # Results directory of this run (the GUI sets it per run), created once
     results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
     os.makedirs(results_dir, exist_ok=True)
-    # av.Df_dataset.to_csv removed - not necessary for output
 
-    # Execute analysis stages
-    if av.N_PDP == 1:
-        try:
-            import N_PDP
-        except ImportError:
-            print("⚠️ N_PDP not found in SAM folder")
-    if av.N_VA_HeatMap == 1:
-        try:
-            import N_VA_HeatMap
-        except ImportError:
-            print("⚠️ N_VA_HeatMap not found in SAM folder")
-    if av.N_VA_HClust == 1:
-        try:
-            import N_VA_HClust
-        except ImportError:
-            print("⚠️ N_VA_HClust not found in SAM folder")
-    
-    if av.N_VA_Mds == 1:
+    # Conditionally run visual modules (based on av toggles)
+    # Only modules that exist in SAM folder
+    if av.N_VA_StaticAbsolute == 1:
         try:
-            import N_VA_Mds
+            run_module('N_VA_StaticAbsolute')
         except ImportError:
-            print("⚠️ N_VA_Mds not found in SAM folder")
+            print("⚠️ N_VA_StaticAbsolute not found in SAM folder")
 
-    if av.N_VA_TopK == 1:
+    if av.N_VA_TennisCourt == 1:
         try:
-            import N_VA_TopK
+            run_module('N_VA_TennisCourt')
         except ImportError:
-            print("⚠️ N_VA_TopK not found in SAM folder")
-    
+            print("⚠️ N_VA_TennisCourt not found in SAM folder")
 
-    av.PDPg_fundamental_active = 0
+    # ---------------- PDP: Fundamental ----------------
+    if av.PDPg_fundamental == 1:
+        print("\n" + "="*60)
+        print("🚀 STARTING PDP: FUNDAMENTAL")
+        print("="*60)
+        av.PDPg_fundamental_active = 1
 
-
-# ---------------- PDP: Buffer ----------------
-if av.PDPg_buffer == 1:
-    print("\n" + "="*60)
-    print("🚀 STARTING PDP: BUFFER")
-    print("="*60)
-    av.PDPg_buffer_active = 1
-
-    try:
-        import N_T_OB  # your buffer-prep module
-        
-        # N_T_OB now creates the file directly in results_dir
-        results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-        buffer_dataset_path = os.path.join(results_dir, "N_C_PDPg_buffer_Dataset.csv")
-        
-        if not os.path.exists(buffer_dataset_path):
-            raise FileNotFoundError(f"❌ Buffer dataset not created: {buffer_dataset_path}")
-        
-        print(f"✅ Buffer dataset created: {buffer_dataset_path}")
-        
-        av.dataset_name = buffer_dataset_path
+        # Copy the active dataset to results directory
+        pdp_dataset_path = os.path.join(results_dir, "N_C_PDPg_fundamental_Dataset.csv")
+    
+        # Only copy if source and destination are different; nothing writes to this file, so a
+        # hard link does instead of a byte copy (copied when linking fails, e.g. across devices)
+        if os.path.abspath(av.dataset_name) != os.path.abspath(pdp_dataset_path):
+            if os.path.lexists(pdp_dataset_path):
+                os.remove(pdp_dataset_path)  # left by an earlier run, possibly a link to another dataset
+            try:
+                os.link(av.dataset_name, pdp_dataset_path)
+            except OSError:
+                shutil.copyfile(av.dataset_name, pdp_dataset_path)
+    
+        av.dataset_name = pdp_dataset_path
         av.dataset_name_exclusive = os.path.splitext(av.dataset_name)[0]
 
+        # Robust read (handles 5 columns)
         (
             av.Df_dataset,
             av.L_dataset,
@@ -183,105 +193,115 @@ if av.PDPg_buffer == 1:
             av.con,
             av.tst,
             av.poi,
-        ) = read_config_csv(buffer_dataset_path)
+        ) = read_config_csv(pdp_dataset_path)
 
-        results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-        os.makedirs(results_dir, exist_ok=True)
         # av.Df_dataset.to_csv removed - not necessary for output
 
-        # Reload analysis modules if they were already imported in the fundamental branch
+        # Execute analysis stages
         if av.N_PDP == 1:
-            importlib.reload(N_PDP)
+            try:
+                run_module('N_PDP')
+            except ImportError:
+                print("⚠️ N_PDP not found in SAM folder")
         if av.N_VA_HeatMap == 1:
-            importlib.reload(N_VA_HeatMap)
+            try:
+                run_module('N_VA_HeatMap')
+            except ImportError:
+                print("⚠️ N_VA_HeatMap not found in SAM folder")
         if av.N_VA_HClust == 1:
-            importlib.reload(N_VA_HClust)
-        
-        if av.N_VA_Mds == 1:
-            importlib.reload(N_VA_Mds)
-        
+            try:
+                run_module('N_VA_HClust')
+            except ImportError:
+                print("⚠️ N_VA_HClust not found in SAM folder")
     
-        if av.N_VA_TopK == 1:
-            importlib.reload(N_VA_TopK)
-        
-    except ImportError as e:
-        print(f"⚠️ N_T_OB import error: {e}")
-        print("Skipping buffer transformation")
-    except FileNotFoundError as e:
-        print(f"❌ {e}")
-        print("Buffer transformation failed - dataset not created")
-    except Exception as e:
-        print(f"❌ Error during buffer transformation: {e}")
-        import traceback
-        traceback.print_exc()
-
-    av.PDPg_buffer_active = 0
-
-
-# ---------------- PDP: Rough ----------------
-if av.PDPg_rough == 1:
-    print("\n" + "="*60)
-    print("🚀 STARTING PDP: ROUGH")
-    print("="*60)
-    av.PDPg_rough_active = 1
-
-    # For rough, you use the fundamental dataset; roughness is applied in inequality calc
-    results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-    pdp_dataset_path = os.path.join(results_dir, "N_C_PDPg_fundamental_Dataset.csv")
-    
-    av.dataset_name = pdp_dataset_path
-    av.dataset_name_exclusive = os.path.splitext(av.dataset_name)[0]
-
-    (
-        av.Df_dataset,
-        av.L_dataset,
-        av.A_dataset,
-        av.con,
-        av.tst,
-        av.poi,
-    ) = read_config_csv(pdp_dataset_path)
+        if av.N_VA_Mds == 1:
+            try:
+                run_module('N_VA_Mds')
+            except ImportError:
+                print("⚠️ N_VA_Mds not found in SAM folder")
 
-    results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-    os.makedirs(results_dir, exist_ok=True)
-    # av.Df_dataset.to_csv removed - not necessary for output
-
-    if av.N_PDP == 1:
-        importlib.reload(N_PDP)
-    if av.N_VA_HeatMap == 1:
-        importlib.reload(N_VA_HeatMap)
-    if av.N_VA_HClust == 1:
-        importlib.reload(N_VA_HClust)
-    
-    if av.N_VA_Mds == 1:
-        importlib.reload(N_VA_Mds)
-    
-    if av.N_VA_TopK == 1:
-        importlib.reload(N_VA_TopK)
+        if av.N_VA_TopK == 1:
+            try:
+                run_module('N_VA_TopK')
+            except ImportError:
+                print("⚠️ N_VA_TopK not found in SAM folder")
     
-    av.PDPg_rough_active = 0
 
+        av.PDPg_fundamental_active = 0
 
-# ---------------- PDP: Buffer + Rough ----------------
-if av.PDPg_bufferrough == 1:
-    print("\n" + "="*60)
-    print("🚀 STARTING PDP: BUFFER + ROUGH")
-    print("="*60)
-    av.PDPg_bufferrough_active = 1
 
-    try:
-        import N_T_OB  # buffer generator (roughness applied later in metrics)
+    # ---------------- PDP: Buffer ----------------
+    if av.PDPg_buffer == 1:
+        print("\n" + "="*60)
+        print("🚀 STARTING PDP: BUFFER")
+        print("="*60)
+        av.PDPg_buffer_active = 1
 
-        # N_T_OB creates buffer dataset - ensure it's in results_dir
-        results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-        os.makedirs(results_dir, exist_ok=True)
+        try:
+            run_module('N_T_OB')  # your buffer-prep module
+        
+            # N_T_OB now creates the file directly in results_dir
+            buffer_dataset_path = os.path.join(results_dir, "N_C_PDPg_buffer_Dataset.csv")
+        
+            if not os.path.exists(buffer_dataset_path):
+                raise FileNotFoundError(f"❌ Buffer dataset not created: {buffer_dataset_path}")
+        
+            print(f"✅ Buffer dataset created: {buffer_dataset_path}")
         
-        # Move buffer dataset if it was created in CWD
-        buffer_cwd = "N_C_PDPg_buffer_Dataset.csv"
-        buffer_results = os.path.join(results_dir, "N_C_PDPg_buffer_Dataset.csv")
-        if os.path.exists(buffer_cwd) and buffer_cwd != buffer_results:
-            shutil.move(buffer_cwd, buffer_results)
+            av.dataset_name = buffer_dataset_path
+            av.dataset_name_exclusive = os.path.splitext(av.dataset_name)[0]
+
+            (
+                av.Df_dataset,
+                av.L_dataset,
+                av.A_dataset,
+                av.con,
+                av.tst,
+                av.poi,
+            ) = read_config_csv(buffer_dataset_path)
+
+            # av.Df_dataset.to_csv removed - not necessary for output
+
+            # Reload analysis modules if they were already imported in the fundamental branch
+            if av.N_PDP == 1:
+                run_module('N_PDP')
+            if av.N_VA_HeatMap == 1:
+                run_module('N_VA_HeatMap')
+            if av.N_VA_HClust == 1:
+                run_module('N_VA_HClust')
         
-        av.dataset_name = buffer_results
+            if av.N_VA_Mds == 1:
+                run_module('N_VA_Mds')
+        
+    
+            if av.N_VA_TopK == 1:
+                run_module('N_VA_TopK')
+        
+        except ImportError as e:
+            print(f"⚠️ N_T_OB import error: {e}")
+            print("Skipping buffer transformation")
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            print("Buffer transformation failed - dataset not created")
+        except Exception as e:
+            print(f"❌ Error during buffer transformation: {e}")
+            import traceback
+            traceback.print_exc()
+
+        av.PDPg_buffer_active = 0
+
+
+    # ---------------- PDP: Rough ----------------
+    if av.PDPg_rough == 1:
+        print("\n" + "="*60)
+        print("🚀 STARTING PDP: ROUGH")
+        print("="*60)
+        av.PDPg_rough_active = 1
+
+        # For rough, you use the fundamental dataset; roughness is applied in inequality calc
+        pdp_dataset_path = os.path.join(results_dir, "N_C_PDPg_fundamental_Dataset.csv")
+    
+        av.dataset_name = pdp_dataset_path
         av.dataset_name_exclusive = os.path.splitext(av.dataset_name)[0]
 
         (
@@ -291,37 +311,117 @@ if av.PDPg_bufferrough == 1:
             av.con,
             av.tst,
             av.poi,
-        ) = read_config_csv(buffer_results)
+        ) = read_config_csv(pdp_dataset_path)
 
-        results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-        os.makedirs(results_dir, exist_ok=True)
         # av.Df_dataset.to_csv removed - not necessary for output
 
         if av.N_PDP == 1:
-            importlib.reload(N_PDP)
+            run_module('N_PDP')
         if av.N_VA_HeatMap == 1:
-            importlib.reload(N_VA_HeatMap)
+            run_module('N_VA_HeatMap')
         if av.N_VA_HClust == 1:
-            importlib.reload(N_VA_HClust)
-        
+            run_module('N_VA_HClust')
+    
         if av.N_VA_Mds == 1:
-            importlib.reload(N_VA_Mds)
-        
+            run_module('N_VA_Mds')
+    
         if av.N_VA_TopK == 1:
-            importlib.reload(N_VA_TopK)
+            run_module('N_VA_TopK')
+    
+        av.PDPg_rough_active = 0
+
+
+    # ---------------- PDP: Buffer + Rough ----------------
+    if av.PDPg_bufferrough == 1:
+        print("\n" + "="*60)
+        print("🚀 STARTING PDP: BUFFER + ROUGH")
+        print("="*60)
+        av.PDPg_bufferrough_active = 1
+
+        try:
+            if av.PDPg_buffer != 1:
+                run_module('N_T_OB')  # buffer generator (roughness applied later in metrics); already ran in the buffer branch otherwise
+
+            # N_T_OB creates buffer dataset - ensure it's in results_dir
+        
+            # Move buffer dataset if it was created in CWD
+            buffer_cwd = "N_C_PDPg_buffer_Dataset.csv"
+            buffer_results = os.path.join(results_dir, "N_C_PDPg_buffer_Dataset.csv")
+            if os.path.exists(buffer_cwd) and buffer_cwd != buffer_results:
+                shutil.move(buffer_cwd, buffer_results)
+        
+            av.dataset_name = buffer_results
+            av.dataset_name_exclusive = os.path.splitext(av.dataset_name)[0]
+
+            (
+                av.Df_dataset,
+                av.L_dataset,
+                av.A_dataset,
+                av.con,
+                av.tst,
+                av.poi,
+            ) = read_config_csv(buffer_results)
+
+            # av.Df_dataset.to_csv removed - not necessary for output
+
+            if av.N_PDP == 1:
+                run_module('N_PDP')
+            if av.N_VA_HeatMap == 1:
+                run_module('N_VA_HeatMap')
+            if av.N_VA_HClust == 1:
+                run_module('N_VA_HClust')
+        
+            if av.N_VA_Mds == 1:
+                run_module('N_VA_Mds')
+        
+            if av.N_VA_TopK == 1:
+                run_module('N_VA_TopK')
         
-    except ImportError:
-        print("⚠️ N_T_OB not found in SAM folder - skipping buffer+rough transformation")
+        except ImportError:
+            print("⚠️ N_T_OB not found in SAM folder - skipping buffer+rough transformation")
 
-    av.PDPg_bufferrough_active = 0
+        av.PDPg_bufferrough_active = 0
 
 
-# ---------------- Final timing ----------------
-if not _already_printed:
+    # ---------------- Final timing ----------------
     elapsed = time.time() - t_start
     print("\n" + "="*60)
     print("✅ ALL PDP PROCESSING COMPLETE!")
     print("="*60)
     print(f'⏱️  Total time elapsed: {elapsed:.3f} sec ({elapsed/60:.2f} min)')
     print("="*60 + "\n")
-    av._moving_objects_printed = True  # Set flag to prevent duplicate print on reload
+
+
+if __name__ == '__main__':
+    # Started by the GUI as a separate process with stdout and stderr redirected to the log file
+    sys.stdout.reconfigure(line_buffering=False)
+    sys.stdout = BufferedLogStream(sys.stdout)
+    if os.path.samestat(os.fstat(sys.stdout.fileno()), os.fstat(sys.stderr.fileno())):
+        # stderr goes to the same file: share the buffer, so a traceback follows the prints before it
+        sys.stderr = sys.stdout
+    atexit.register(sys.stdout.close)
+    # The GUI's Stop sends SIGTERM: exit through SystemExit instead, so atexit still writes the buffered log
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+    # The final status is recorded here, not by the GUI: the GUI session that started the analysis may be gone.
+    # A stop (SIGTERM -> SystemExit) is not an error; the GUI records it
+    results_dir = os.environ.get('AV_RESULTS_DIR')
+    try:
+        # Dataset and parameters chosen in the GUI (JSON in AV_PARAMS); without them av has loaded its defaults
+        params = json.loads(os.environ.get('AV_PARAMS', '{}'))
+        if params:
+            av.load_dataset(params['dataset_name'])
+            av.configure(**params)
+        print('✅ Configuration loaded successfully')
+        print(f'🔢 Configurations: {av.con}, Timestamps: {av.tst}, Points: {av.poi}')
+        print('='*60)
+
+        run()
+    except Exception as e:
+        if results_dir:
+            write_status(results_dir, 'error', error=str(e))
+        raise
+    print('\n✅ Analysis completed successfully!')
+    if results_dir:
+        sys.stdout.flush()  # the complete log is on disk before the status says so
+        write_status(results_dir, 'finished')
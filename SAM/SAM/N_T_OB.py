@@ -12,66 +12,78 @@ OUTPUT
 INPUT PARAMETERS: buffer distance buffer_x and buffer_y
 """
 
-import csv
+import numpy as np
+import pandas as pd
 import time
 import os
 
-# Import av to get buffer values and dataset path
-try:
-    import av
-    buffer_x = av.buffer_x if hasattr(av, 'buffer_x') else 25
-    buffer_y = av.buffer_y if hasattr(av, 'buffer_y') else 10
-    
-    # Get the original dataset path from environment or av
-    dataset_path = os.environ.get('AV_DATASET', av.dataset_name if hasattr(av, 'dataset_name') else 'N_C_Dataset.csv')
-except ImportError:
-    print("⚠️ av module not found - using default buffer values")
-    buffer_x = 25
-    buffer_y = 10
-    dataset_path = 'N_C_Dataset.csv'
-
-print(f"🔧 Buffer transformation: buffer_x={buffer_x}, buffer_y={buffer_y}")
-print(f"📂 Reading dataset: {dataset_path}")
-
-# Start time
-t_start = time.time()
-
-# Check if input file exists
-if not os.path.exists(dataset_path):
-    raise FileNotFoundError(f"❌ Dataset file not found: {dataset_path}")
-
-# Open the CSV
-with open(dataset_path, 'r') as csv_file:
-    # Read the CSV
-    csv_reader = csv.reader(csv_file)
-
-    # Add new lines with buffers in x and y directions
-    lines = []
-    for line in csv_reader:
-        # Skip empty rows or rows with insufficient columns
-        if not line or len(line) < 5:
-            continue
-            
-        # Append original and buffered points for both x and y directions
-        lines.append([line[0], line[1], round((float(line[2]) * 5 + 0), 2), round((float(line[3]) - buffer_x), 2), line[4]])
-        lines.append([line[0], line[1], round((float(line[2]) * 5 + 1), 2), round((float(line[3]) + buffer_x), 2), line[4]])
-        lines.append([line[0], line[1], round((float(line[2]) * 5 + 2), 2), line[3], line[4]])  # No buffer in x-direction
-        lines.append([line[0], line[1], round((float(line[2]) * 5 + 3), 2), line[3], round((float(line[4]) - buffer_y), 2)])
-        lines.append([line[0], line[1], round((float(line[2]) * 5 + 4), 2), line[3], round((float(line[4]) + buffer_y), 2)])
-
-# Determine output path (write to results directory if available)
-results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-output_path = os.path.join(results_dir, 'N_C_PDPg_buffer_Dataset.csv')
-
-print(f"💾 Saving buffer dataset to: {output_path}")
-
-# Save the new CSV file
-with open(output_path, 'w', newline='') as new_csv_file:
-    csv_writer = csv.writer(new_csv_file)
-
-    # Write the new lines
-    for line in lines:
-        csv_writer.writerow(line)
-
-# End and print time
-print('Time elapsed for running module "N_T_OB": {:.3f} sec.'.format(time.time() - t_start))
+
+def round_text(values):
+    """
+    Returns the values rounded to 2 decimals with Python's round(), as text.
+    """
+    return [str(round(value, 2)) for value in values.tolist()]
+
+
+def run():
+    """
+    Writes the buffer dataset N_C_PDPg_buffer_Dataset.csv for the dataset and buffer distances in av.
+    """
+    # Import av to get buffer values and dataset path
+    try:
+        import av
+        buffer_x = av.buffer_x if hasattr(av, 'buffer_x') else 25
+        buffer_y = av.buffer_y if hasattr(av, 'buffer_y') else 10
+
+        # Get the original dataset path from environment or av
+        dataset_path = os.environ.get('AV_DATASET', av.dataset_name if hasattr(av, 'dataset_name') else 'N_C_Dataset.csv')
+    except ImportError:
+        print("⚠️ av module not found - using default buffer values")
+        buffer_x = 25
+        buffer_y = 10
+        dataset_path = 'N_C_Dataset.csv'
+
+    print(f"🔧 Buffer transformation: buffer_x={buffer_x}, buffer_y={buffer_y}")
+    print(f"📂 Reading dataset: {dataset_path}")
+
+    # Start time
+    t_start = time.time()
+
+    # Check if input file exists
+    if not os.path.exists(dataset_path):
+        raise FileNotFoundError(f"❌ Dataset file not found: {dataset_path}")
+
+    # Read the CSV; the columns are kept as text so unchanged coordinates are written back verbatim
+    df = pd.read_csv(dataset_path, header=None, dtype=str)
+    df = df[df[4].notna()]  # Skip rows with insufficient columns
+
+    # Five buffered points per original point (poiID * 5 + 0..4): -x, +x, no buffer, -y, +y.
+    # Rounded with Python's round() on floats, as the csv writer did: np.round rounds halves differently
+    x_text, y_text = df[3].to_numpy(), df[4].to_numpy()
+    x, y = x_text.astype(float), y_text.astype(float)
+    poi_ids = df[2].to_numpy(dtype=float)[:, None] * 5 + np.arange(5)
+    x_values = np.column_stack([round_text(x - buffer_x), round_text(x + buffer_x), x_text, x_text, x_text])
+    y_values = np.column_stack([y_text, y_text, y_text, round_text(y - buffer_y), round_text(y + buffer_y)])
+    lines = pd.DataFrame({
+        0: np.repeat(df[0].to_numpy(), 5),
+        1: np.repeat(df[1].to_numpy(), 5),
+        2: round_text(poi_ids.ravel()),
+        3: x_values.ravel(),
+        4: y_values.ravel(),
+    })
+
+    # Determine output path (write to results directory if available)
+    results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
+    output_path = os.path.join(results_dir, 'N_C_PDPg_buffer_Dataset.csv')
+
+    print(f"💾 Saving buffer dataset to: {output_path}")
+
+    # Save the new CSV file
+    lines.to_csv(output_path, header=False, index=False)
+
+    # End and print time
+    print('Time elapsed for running module "N_T_OB": {:.3f} sec.'.format(time.time() - t_start))
+
+
+if __name__ == '__main__':
+    run()
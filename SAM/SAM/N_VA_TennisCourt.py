@@ -3,183 +3,234 @@
 # Visualizes configurations on a tennis court using Plotly
 # Based on N_VA_StaticAbsolute but adapted for tennis analysis
 
+import importlib.util
+import numpy as np
 import os
 import pandas as pd
 import time
 import plotly.graph_objects as go
+import plotly.io as pio
 
 # Import custom modules
 import av
 from tennis_court_draw import create_tennis_court
 
-# Start time
-t_start = time.time()
-
-# Load the dataset
-df = pd.read_csv(av.dataset_name, header=None)
-
-# Get the unique configurations
-configurations = df[0].unique()
-
-# Define colors for different players/ball
-# Using distinct colors that show well on green background
-if av.poi == 2:
-    colors = ['yellow', 'cyan']  # Player 1 (yellow), Player 2 (cyan)
-    labels = ['Speler 1', 'Speler 2']
-elif av.poi == 3:
-    colors = ['yellow', 'cyan', 'white']  # Player 1, Player 2, Ball
-    labels = ['Speler 1', 'Speler 2', 'Bal']
-else:
-    # Generate colors for any number of points
-    import plotly.express as px
-    color_sequence = px.colors.qualitative.Set3
-    colors = [color_sequence[i % len(color_sequence)] for i in range(av.poi)]
-    labels = [f'Punt {i}' for i in range(av.poi)]
-
-# Create visualizations for each configuration
-for config in configurations:
-    config_data = df[df[0] == config]  # Get data for current configuration
-    
-    # Get x/y coordinates
-    x = config_data[3]
-    y = config_data[4]
-    
-    # Create tennis court as base
-    fig = create_tennis_court()
-    
-    # Check if there's only one timestamp
-    if av.tst == 1:
-        # Single timestamp: just show points
-        for point_index in range(av.poi):
-            x_val = x.iloc[point_index]
-            y_val = y.iloc[point_index]
-            
-            fig.add_trace(
-                go.Scatter(
-                    x=[x_val],
-                    y=[y_val],
-                    mode='markers+text',
-                    marker=dict(
-                        size=15,
-                        color=colors[point_index % len(colors)],
-                        symbol='circle',
-                        line=dict(color='black', width=2)
-                    ),
-                    text=[f'p{point_index}'],
-                    textposition='top center',
-                    textfont=dict(size=14, color='white'),
-                    name=labels[point_index % len(labels)],
-                    hovertemplate=f'{labels[point_index % len(labels)]}<br>x: %{{x:.2f}}m<br>y: %{{y:.2f}}m<extra></extra>'
-                )
-            )
+# Maximum number of positions drawn per trajectory; longer trajectories are downsampled
+MAX_TRAJECTORY_POINTS = 500
+
+
+def downsample_trajectory(xy, n_out):
+    """
+    Returns the indices of at most n_out positions of the trajectory xy ((n, 2), in time order).
+    Largest-Triangle-Three-Buckets in the court plane: the first and last position are kept and each
+    bucket in between keeps the position spanning the largest triangle with the previous pick and
+    the mean of the next bucket, so the turns of the path are preserved.
+    """
+    n = len(xy)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 buckets between first and last
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    prev = xy[0]
+    for b in range(n_out - 2):
+        candidates = xy[edges[b]:edges[b + 1]]
+        following = xy[edges[b + 1]:edges[b + 2]].mean(axis=0) if b + 2 < len(edges) else xy[-1]
+        area = np.abs((prev[0] - following[0]) * (candidates[:, 1] - prev[1])
+                      - (prev[0] - candidates[:, 0]) * (following[1] - prev[1]))
+        keep[b + 1] = edges[b] + area.argmax()
+        prev = xy[keep[b + 1]]
+    return keep
+
+
+def run():
+    """
+    Creates the tennis court visualization of every configuration of the dataset in av.
+    """
+    # Start time
+    t_start = time.time()
+
+    # Load the dataset
+    # Only the configuration and x/y columns are used; the pyarrow engine numbers the selected
+    # columns from 0, so their positions in the file are restored as labels
+    df = pd.read_csv(av.dataset_name, header=None, usecols=[0, 3, 4], engine=av.CSV_ENGINE).set_axis([0, 3, 4], axis=1)
+
+    # Group the rows per configuration in one pass
+    config_groups = df.groupby(0, sort=False)
+
+    # Define one color and one label per point (player/ball)
+    # Using distinct colors that show well on green background
+    if av.poi == 2:
+        colors = ['yellow', 'cyan']  # Player 1 (yellow), Player 2 (cyan)
+        labels = ['Speler 1', 'Speler 2']
+    elif av.poi == 3:
+        colors = ['yellow', 'cyan', 'white']  # Player 1, Player 2, Ball
+        labels = ['Speler 1', 'Speler 2', 'Bal']
     else:
-        # Multiple timestamps: show trajectories with arrows
-        for p in range(av.poi):  # For each point (player/ball)
-            x_trajectory = []
-            y_trajectory = []
-            
-            # Collect all positions for this point across timestamps
-            for i in range(av.tst):
-                idx = p + i * av.poi
-                x_trajectory.append(x.iloc[idx])
-                y_trajectory.append(y.iloc[idx])
-            
-            # Add trajectory line
-            fig.add_trace(
-                go.Scatter(
-                    x=x_trajectory,
-                    y=y_trajectory,
-                    mode='lines',
-                    line=dict(
-                        color=colors[p % len(colors)],
-                        width=3,
-                        dash='solid'
-                    ),
-                    name=f'{labels[p % len(labels)]} traject',
-                    showlegend=True,
-                    hoverinfo='skip'
+        # Generate colors for any number of points
+        import plotly.express as px
+        color_sequence = px.colors.qualitative.Set3
+        colors = [color_sequence[i % len(color_sequence)] for i in range(av.poi)]
+        labels = [f'Punt {i}' for i in range(av.poi)]
+
+    results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
+    module_dir = os.path.join(results_dir, 'TennisCourt')
+    os.makedirs(module_dir, exist_ok=True)
+
+    # PNG copies are optional (AV_EXPORT_PNG=1): kaleido renders them in a headless browser,
+    # which costs far more than the HTML, so they are exported together after the loop
+    export_png = os.environ.get('AV_EXPORT_PNG') == '1'
+    png_figures, png_paths = [], []
+
+    # The tennis court is the same for every configuration: draw it once and copy it
+    court_fig = create_tennis_court()
+
+    # Create visualizations for each configuration
+    for config, config_data in config_groups:
+
+        # Get x/y coordinates, ordered by timestamp, then point
+        positions = config_data[[3, 4]].to_numpy()
+
+        # Copy of the tennis court as base
+        fig = go.Figure(court_fig)
+        traces = []  # added to the figure together, in one validation pass
+
+        # Check if there's only one timestamp
+        if av.tst == 1:
+            # Single timestamp: just show points
+            for point_index in range(av.poi):
+                x_val, y_val = positions[point_index]
+
+                traces.append(
+                    go.Scatter(
+                        x=[x_val],
+                        y=[y_val],
+                        mode='markers+text',
+                        marker=dict(
+                            size=15,
+                            color=colors[point_index],
+                            symbol='circle',
+                            line=dict(color='black', width=2)
+                        ),
+                        text=[f'p{point_index}'],
+                        textposition='top center',
+                        textfont=dict(size=14, color='white'),
+                        name=labels[point_index],
+                        hovertemplate=f'{labels[point_index]}<br>x: %{{x:.2f}}m<br>y: %{{y:.2f}}m<extra></extra>'
+                    )
                 )
-            )
-            
-            # Add arrow markers for each movement segment
-            for i in range(av.tst - 1):
-                x1 = x_trajectory[i]
-                y1 = y_trajectory[i]
-                x2 = x_trajectory[i + 1]
-                y2 = y_trajectory[i + 1]
-                
-                # Calculate arrow direction
-                dx = x2 - x1
-                dy = y2 - y1
-                
-                # Add arrow annotation
-                fig.add_annotation(
-                    x=x2,
-                    y=y2,
-                    ax=x1,
-                    ay=y1,
-                    xref='x',
-                    yref='y',
-                    axref='x',
-                    ayref='y',
-                    showarrow=True,
-                    arrowhead=2,
-                    arrowsize=1.5,
-                    arrowwidth=2,
-                    arrowcolor=colors[p % len(colors)],
-                    opacity=0.8
+        else:
+            # Multiple timestamps: show trajectories with arrows
+            for p in range(av.poi):  # For each point (player/ball)
+                # Positions of this point at every timestamp (rows are ordered by timestamp, then point);
+                # long trajectories are reduced to the positions that keep their shape
+                xy = positions[p::av.poi]
+                t_kept = downsample_trajectory(xy, MAX_TRAJECTORY_POINTS)
+                x_trajectory = xy[t_kept, 0]
+                y_trajectory = xy[t_kept, 1]
+
+                # Add trajectory line, with an arrow head at the end of each movement segment;
+                # the arrows point along the segment they end (angleref='previous'), so the whole
+                # trajectory is one trace instead of an annotation per segment
+                traces.append(
+                    go.Scatter(
+                        x=x_trajectory,
+                        y=y_trajectory,
+                        mode='lines+markers',
+                        line=dict(
+                            color=colors[p],
+                            width=3,
+                            dash='solid'
+                        ),
+                        marker=dict(
+                            symbol='arrow',
+                            angleref='previous',
+                            size=[0] + [16] * (len(t_kept) - 1),  # no arrow at the first position
+                            standoff=7,  # stop at the edge of the position marker
+                            color=colors[p],
+                            opacity=0.8
+                        ),
+                        name=f'{labels[p]} traject',
+                        showlegend=True,
+                        hoverinfo='skip'
+                    )
                 )
-            
-            # Add position markers at each timestamp
-            fig.add_trace(
+
+                # Add position markers at each timestamp (WebGL, which stays smooth for long trajectories)
+                traces.append(
+                    go.Scattergl(
+                        x=x_trajectory,
+                        y=y_trajectory,
+                        mode='markers',
+                        marker=dict(
+                            size=12,
+                            color=colors[p],
+                            symbol='circle',
+                            line=dict(color='black', width=2)
+                        ),
+                        customdata=t_kept,  # the timestamp of each drawn position
+                        name=f'{labels[p]} posities',
+                        showlegend=False,
+                        hovertemplate=f'{labels[p]}<br>Tijd: t%{{customdata}}<br>x: %{{x:.2f}}m<br>y: %{{y:.2f}}m<extra></extra>'
+                    )
+                )
+
+            # Label the first position of every point, in one small SVG trace
+            first_positions = positions[:av.poi]
+            traces.append(
                 go.Scatter(
-                    x=x_trajectory,
-                    y=y_trajectory,
-                    mode='markers+text',
-                    marker=dict(
-                        size=12,
-                        color=colors[p % len(colors)],
-                        symbol='circle',
-                        line=dict(color='black', width=2)
-                    ),
-                    text=[f'p{p}' if i == 0 else '' for i in range(len(x_trajectory))],
+                    x=first_positions[:, 0],
+                    y=first_positions[:, 1],
+                    mode='text',
+                    text=[f'p{p}' for p in range(av.poi)],
                     textposition='top center',
                     textfont=dict(size=14, color='white'),
-                    name=f'{labels[p % len(labels)]} posities',
                     showlegend=False,
-                    hovertemplate=f'{labels[p % len(labels)]}<br>Tijd: t%{{pointIndex}}<br>x: %{{x:.2f}}m<br>y: %{{y:.2f}}m<extra></extra>'
+                    hoverinfo='skip'
                 )
             )
-    
-    # Update layout with configuration title
-    fig.update_layout(
-        title=dict(
-            text=f'Configuratie {config} - Tennis Baan Analyse',
-            font=dict(size=20, color='white'),
-            x=0.5,
-            xanchor='center'
-        ),
-        paper_bgcolor='#1a1a1a',  # Dark background around the court
-        font=dict(color='white')
-    )
-    
-    # Save the figure
-    file_name = f"Tennis_Config_{config}.html"
-    results_dir = os.environ.get('AV_RESULTS_DIR', os.getcwd())
-    module_dir = os.path.join(results_dir, 'TennisCourt')
-    os.makedirs(module_dir, exist_ok=True)
-    out_path = os.path.join(module_dir, file_name)
-    
-    fig.write_html(out_path)
-    
-    # Also save as PNG if kaleido is available
-    try:
-        png_path = os.path.join(module_dir, f"Tennis_Config_{config}.png")
-        fig.write_image(png_path, width=800, height=1400)
-    except Exception as e:
-        # Kaleido not installed or other error - skip PNG export
-        pass
-
-# End and print time
-print('Time elapsed for running module "N_VA_TennisCourt": {:.3f} sec.'.format(time.time() - t_start))
-print(f'Created {len(configurations)} tennis court visualizations in {module_dir}')
+
+        fig.add_traces(traces)
+
+        # Update layout with configuration title
+        fig.update_layout(
+            title=dict(
+                text=f'Configuratie {config} - Tennis Baan Analyse',
+                font=dict(size=20, color='white'),
+                x=0.5,
+                xanchor='center'
+            ),
+            paper_bgcolor='#1a1a1a',  # Dark background around the court
+            font=dict(color='white')
+        )
+
+        # Save the figure
+        file_name = f"Tennis_Config_{config}.html"
+        out_path = os.path.join(module_dir, file_name)
+
+        # plotly.js is written once next to the HTML files and shared by them, instead of inlined
+        # in every file; the files keep working offline (e.g. from the results ZIP)
+        fig.write_html(out_path, include_plotlyjs='directory', config={'responsive': True})
+
+        if export_png:
+            png_figures.append(fig)
+            png_paths.append(os.path.join(module_dir, f"Tennis_Config_{config}.png"))
+
+    # Save the PNG copies, if kaleido is available; rendering errors are not hidden
+    if png_figures:
+        if importlib.util.find_spec('kaleido') is None:
+            print('PNG export of the tennis court visualizations skipped: kaleido is not installed')
+        elif hasattr(pio, 'write_images'):
+            # plotly >= 6.1: all figures in one kaleido session
+            pio.write_images(png_figures, png_paths, width=800, height=1400)
+        else:
+            for png_figure, png_path in zip(png_figures, png_paths):
+                pio.write_image(png_figure, png_path, width=800, height=1400)
+
+    # End and print time
+    print('Time elapsed for running module "N_VA_TennisCourt": {:.3f} sec.'.format(time.time() - t_start))
+    print(f'Created {config_groups.ngroups} tennis court visualizations in {module_dir}')
+
+
+if __name__ == '__main__':
+    run()
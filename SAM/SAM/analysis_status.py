@@ -0,0 +1,27 @@
+"""
+Analysis Status File
+====================
+
+Writes analysis_status.json in the results directory: the Streamlit GUI records that an analysis
+is running (or was stopped), N_Moving_Objects records when it has finished or failed.
+Imports only the standard library, so both processes can use it.
+"""
+
+import json
+import os
+import time
+
+STATUS_FILE_NAME = 'analysis_status.json'
+
+
+def write_status(results_dir, status, **details):
+    """
+    Writes the analysis status to analysis_status.json.
+    The file is written to a temporary name first and then swapped in with os.replace,
+    so a reader never sees a half-written status.
+    """
+    status_file_path = os.path.join(results_dir, STATUS_FILE_NAME)
+    tmp_path = f'{status_file_path}.{os.getpid()}.tmp'  # the GUI and the analysis process may both write
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'status': status, 'time': time.time(), **details}, f)
+    os.replace(tmp_path, status_file_path)
@@ -13,6 +13,13 @@ import os  # For file handling
 import pandas as pd  # For data manipulation
 import time  # For timing the code
 
+# Optional: pyarrow parses CSV files multithreaded; pandas' own C parser is used without it
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
 # Record the start time of the script
 t_start = time.time()
 
@@ -127,10 +134,21 @@ if graphical_user_interface == 1:
     submit_btn.pack(pady=20)
     root.mainloop()
 
-if AV_SKIP_LOAD != '1':
+# Load the dataset and detect its dimensions; the results are module-level settings used by all modules
+def load_dataset(path):
+    """
+    Reads the dataset at `path` into Df_dataset, L_dataset and A_dataset and sets con, tst, poi
+    and the PDP activation flags. Called on import, or by a GUI with the dataset chosen there.
+    """
+    global dataset_name, dataset_name_exclusive, Df_dataset, L_dataset, A_dataset, con, tst, poi
+    global PDPg_fundamental_active, PDPg_buffer_active, PDPg_rough_active, PDPg_bufferrough_active
+    global D_point_mapping, curr_point_id
+    t_load = time.time()
+    D_point_mapping = {}
+    curr_point_id = 0
+
     # Output the current working directory and dataset details
-    # Allow the dataset filename to be overridden by an environment variable (used by GUI)
-    dataset_name = os.environ.get('AV_DATASET', 'N_C_Dataset.csv')  # The name of the dataset file
+    dataset_name = path  # The name of the dataset file
     dataset_name_exclusive = dataset_name[:-4]  # The name of the dataset file without the extension
 
     # Read and process the dataset
@@ -141,13 +159,13 @@ if AV_SKIP_LOAD != '1':
     L_dataset = []  # Initialize an empty list for dataset entries
     with open(dataset_name) as csv_file:
         csv_reader = csv.reader(csv_file, delimiter=',')
-        
+    
         # Read each row from the CSV file
         for L_row in csv_reader:
             # Skip empty rows
             if not L_row or len(L_row) < 5:
                 continue
-                
+            
             poi_id = L_row[0]
             try:
                 # Attempt to convert poiID to integer
@@ -184,4 +202,20 @@ if AV_SKIP_LOAD != '1':
         print("ERROR IN VALUE OF VARIABLE: window_length_tst > tst")
 
     # Final output to indicate the duration the script has run
-    print('Time elapsed for running module "av": {:.3f} sec.'.format(time.time() - t_start))
\ No newline at end of file
+    print('Time elapsed for running module "av": {:.3f} sec.'.format(time.time() - t_load))
+
+
+# Apply settings chosen in a GUI; only existing settings are replaced
+def configure(**params):
+    """
+    Overrides the settings above with the given values, e.g. configure(buffer_x=2, N_PDP=0).
+    Names that are not settings of this module are ignored.
+    """
+    for key, value in params.items():
+        if key in globals():
+            globals()[key] = value
+
+
+# Allow the dataset filename to be overridden by an environment variable (used by GUI)
+if AV_SKIP_LOAD != '1':
+    load_dataset(os.environ.get('AV_DATASET', 'N_C_Dataset.csv'))
@@ -0,0 +1,135 @@
+"""
+Static Absolute Drawing Function
+================================
+
+Draws the static absolute plots (points and arrows between time stamps on a tennis court) with matplotlib.
+Has no side effects on import and does not read av, so N_VA_StaticAbsolute and N_VA_StaticAbsolute_tennis
+can run it in worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend to avoid GUI threading issues
+import matplotlib.patches as patches  # For drawing shapes
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # Renders without pyplot
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+import numpy as np
+import os
+
+# Matplotlib settings for the static absolute plots
+RC_PARAMS = {'figure.dpi': 100, 'font.family': 'monospace', 'font.size': 12}
+
+# Minimum number of configurations per worker process
+CONFIGS_PER_WORKER = 4
+
+
+def render_configurations(config_points, settings, colors, module_dir, dpi=100, margins=None):
+    """
+    Saves one plot per configuration as N_C_Csa<config>.png in module_dir.
+
+    config_points: list of (config, xy) with xy the (n, 2) x/y values, ordered by timestamp, then point
+    settings: dict with tst, poi and the min/max_boundary_x/y values from av
+    colors: (poi, 4) RGBA array, one row per point
+    dpi: resolution of the saved PNG files
+    margins: fig.subplots_adjust() arguments; the plots are cropped with bbox_inches='tight' without them
+
+    The figure with the axes and the tennis court is built once; per configuration only the
+    points, arrows, labels and title are drawn, and removed again after saving.
+    """
+    matplotlib.rcParams.update(RC_PARAMS)
+    tst, poi = settings['tst'], settings['poi']
+
+    fig = Figure(figsize=(18, 18), dpi=100.0)  # Set the size of the figure
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if margins:
+        fig.subplots_adjust(**margins)
+
+    # Set the limits of the axes (always use boundaries if available)
+    ax.set_xlim(settings['min_boundary_x'], settings['max_boundary_x'])
+    ax.set_ylim(settings['min_boundary_y'], settings['max_boundary_y'])
+
+    # Set the labels of the axes
+    ax.set_xlabel('X-Axis (m)', fontsize=30, fontname='monospace')
+    ax.set_ylabel('Y-Axis (m)', fontsize=30, fontname='monospace')
+
+    # Draw tennis court (always enabled)
+    # Full singles tennis court: 8.23 m x 23.77 m, bottom-left at (0, 0)
+    court_boundary = patches.Rectangle((0, 0), 8.23, 23.77, linewidth=2, edgecolor='green', facecolor='none')
+    ax.add_patch(court_boundary)
+
+    # Net line (horizontal line across middle of the court)
+    ax.add_line(Line2D([0, 8.23], [11.885, 11.885], color='green', linewidth=1))
+
+    # Center service line (vertical line through middle of service boxes)
+    ax.add_line(Line2D([4.115, 4.115], [5.485, 18.285], color='green', linewidth=1, linestyle='dotted'))
+
+    # Service box horizontal lines (top and bottom of service boxes)
+    ax.add_line(Line2D([0, 8.23], [5.485, 5.485], color='green', linewidth=1, linestyle='dotted'))
+    ax.add_line(Line2D([0, 8.23], [18.285, 18.285], color='green', linewidth=1, linestyle='dotted'))
+
+    ax.tick_params(axis='both', labelsize=30, labelcolor='black')
+
+    # Create the scatterplot, including arrows
+    for config, xy in config_points:
+        # Data range in x, used for the arrow head size
+        x_range = xy[:, 0].max() - xy[:, 0].min()
+
+        # Check if there's only one timestamp
+        if tst == 1:
+            point_colors = colors[np.arange(len(xy)) % len(colors)]
+            config_artists = [ax.scatter(xy[:, 0], xy[:, 1], color=point_colors, s=200, rasterized=True)]  # s is the marker size
+        else:
+            # Rows are ordered by timestamp, then point: reshape to (tst, poi, 2)
+            pts = xy.astype(np.float32).reshape(tst, poi, 2)
+            # Intervals ordered by point, then timestamp, so later points are drawn on top
+            starts = pts[:-1].transpose(1, 0, 2).reshape(-1, 2)  # start of each interval, for every point
+            deltas = (pts[1:] - pts[:-1]).transpose(1, 0, 2).reshape(-1, 2)
+            # Use the custom color list to assign a unique color to each point
+            arrow_colors = np.repeat(colors, tst - 1, axis=0)  # colors holds one row per point
+
+            # Dynamic arrow head sizing based on actual data range
+            head_width = (x_range + 2) / 40
+            head_length = (x_range + 2) / 20
+
+            # Add vectors between points: the same arrows as plt.arrow (fixed head size, head included
+            # in the length), drawn together as one collection instead of one patch artist per arrow
+            arrow_patches = [patches.FancyArrow(x, y, dx, dy, width=0.001, length_includes_head=True,
+                                                head_width=head_width, head_length=head_length)
+                             for (x, y), (dx, dy) in zip(starts, deltas)]
+            arrows = ax.add_collection(PatchCollection(arrow_patches, facecolors=arrow_colors,
+                                                       edgecolors=arrow_colors, linewidths=10, joinstyle='miter'))
+            config_artists = [arrows]
+
+            # Add label for the first timestamp of each point
+            for p in range(poi):
+                config_artists.append(ax.text(pts[0, p, 0], pts[0, p, 1], f'p{p}', fontsize=30, ha='right'))
+
+        ax.set_title(f"Configuration {config}", fontname="monospace", fontsize=40)
+        file_name = f"N_C_Csa{config}.png"  # csa from configuration static absolute
+        out_path = os.path.join(module_dir, file_name)
+        fig.savefig(out_path, dpi=dpi, bbox_inches=None if margins else 'tight')
+
+        # Clear this configuration from the figure for the next one
+        for artist in config_artists:
+            artist.remove()
+
+
+def render_all_configurations(config_points, settings, colors, module_dir, **render_options):
+    """
+    Runs render_configurations() for all configurations. The plots are independent: they are spread
+    over worker processes, with enough configurations per worker to pay for starting it.
+    render_options are passed on to render_configurations().
+    """
+    workers = min(os.cpu_count() or 1, len(config_points) // CONFIGS_PER_WORKER)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(render_configurations, config_points[w::workers], settings, colors, module_dir,
+                                **render_options)
+                    for w in range(workers)]
+            for job in jobs:
+                job.result()  # re-raises an error of the worker
+    else:
+        render_configurations(config_points, settings, colors, module_dir, **render_options)